@@ -1,9 +1,214 @@
 # ast_nodes.py
 
+from itertools import count, product
+from string import ascii_letters
+
+# Precedencia de los operadores en JavaScript (mayor = se evalúa antes).
+# Sólo se usa en modo compacto para decidir dónde hacen falta paréntesis.
+JS_PRECEDENCE = {
+    'MULT': 13,
+    'DIV': 13,
+    'PLUS': 12,
+    'MINUS': 12,
+    'GT': 10,
+    'LT': 10,
+    'GTE': 10,
+    'LTE': 10,
+    'EQ': 9,
+    'NEQ': 9,
+}
+
+# Palabras reservadas cortas que nunca pueden usarse como nombre generado
+JS_SHORT_RESERVED = {'do', 'if', 'in', 'for', 'let', 'new', 'try', 'var'}
+
+
+class _Layout:
+    """
+    Separadores del código generado según el modo (normal o compacto). Se
+    calcula una vez por contexto y se guarda en él, en lugar de consultar
+    las opciones en cada nodo.
+    """
+    __slots__ = ("minified", "unit", "eq", "sep")
+
+    def __init__(self, minified):
+        self.minified = minified
+        self.unit = "" if minified else "    "  # un nivel de indentación
+        self.eq = "=" if minified else " = "
+        self.sep = "," if minified else ", "
+
+
+_PRETTY = _Layout(False)
+
+
+def _layout(context):
+    if not context:
+        return _PRETTY
+    layout = context.get("layout")
+    if layout is None:
+        layout = context["layout"] = _Layout(bool(context.get("minify", False)))
+    return layout
+
+
+def _statements_js(statements, indent, context):
+    """
+    Genera y une las sentencias de un bloque. En modo compacto no hay saltos
+    de línea, así que una llamada suelta (la única sentencia que no termina
+    en ';' o '}') necesita su ';' explícito.
+
+    Si el contexto trae un presupuesto ("budget"), cada bloque unido se
+    compara con el tamaño máximo de salida y con el tiempo límite.
+    """
+    if _layout(context).minified:
+        joined = "".join([
+            stmt.to_js(indent, context) + ";" if stmt.__class__ is FunctionCallNode
+            else stmt.to_js(indent, context)
+            for stmt in statements
+        ])
+    else:
+        joined = "\n".join([stmt.to_js(indent, context) for stmt in statements])
+    budget = context.get("budget") if context else None
+    if budget is not None:
+        budget.check_output(joined)
+        budget.check_deadline()
+    return joined
+
+
+def _local_name(name, context):
+    """Devuelve el nombre acortado de una variable local, si existe."""
+    if context and "renames" in context:
+        return context["renames"].get(name, name)
+    return name
+
+
+def _collect_names(node, names):
+    """Agrega a names todos los identificadores usados en el subárbol."""
+    # Iterativo y comparando la clase exacta: se llama para cada función al
+    # acortar nombres, y los isinstance encadenados dominaban el modo mangle
+    pending = [node]
+    pop, push, extend = pending.pop, pending.append, pending.extend
+    while pending:
+        node = pop()
+        cls = node.__class__
+        if cls is list:
+            extend(node)
+        elif cls is IdentifierNode:
+            names.add(node.name)
+        elif cls is BinOpNode:
+            push(node.left)
+            push(node.right)
+        elif cls is FunctionCallNode:
+            if isinstance(node.name, str):
+                names.add(node.name)
+            else:
+                push(node.name)
+            extend(node.args)
+        elif cls is AssignNode:
+            push(node.target)
+            push(node.value)
+        elif cls is PrintNode or cls is ReturnNode:
+            if node.value is not None:
+                push(node.value)
+        elif cls is IfNode:
+            push(node.condition)
+            extend(node.body)
+            extend(node.else_body or ())
+        elif cls is WhileNode:
+            push(node.condition)
+            extend(node.body)
+        elif cls is ForNode:
+            push(node.variable)
+            push(node.iterable)
+            extend(node.body)
+        elif cls is RangeNode:
+            extend((node.start, node.stop, node.step))
+        elif cls is FunctionDefNode:
+            names.add(node.name)
+            extend(node.params)
+            extend(node.body)
+
+
+def _collect_locals(statements, local_names):
+    """
+    Agrega a local_names (en orden de aparición) las variables que una función
+    declara en su propio scope: asignaciones, variables de for y funciones
+    anidadas. No entra en el cuerpo de las funciones anidadas.
+    """
+    for stmt in statements:
+        if isinstance(stmt, AssignNode) and isinstance(stmt.target, IdentifierNode):
+            local_names.setdefault(stmt.target.name, None)
+        elif isinstance(stmt, ForNode) and isinstance(stmt.variable, IdentifierNode):
+            local_names.setdefault(stmt.variable.name, None)
+            _collect_locals(stmt.body, local_names)
+        elif isinstance(stmt, IfNode):
+            _collect_locals(stmt.body, local_names)
+            _collect_locals(stmt.else_body or [], local_names)
+        elif isinstance(stmt, WhileNode):
+            _collect_locals(stmt.body, local_names)
+        elif isinstance(stmt, FunctionDefNode):
+            local_names.setdefault(stmt.name, None)
+
+
+def function_locals(func):
+    """
+    Devuelve, en orden de aparición, los nombres locales de una función:
+    primero sus parámetros y después las variables que declara en su cuerpo.
+    """
+    local_names = {}
+    for param in func.params:
+        if isinstance(param, IdentifierNode):
+            local_names.setdefault(param.name, None)
+    _collect_locals(func.body, local_names)
+    return list(local_names)
+
+
+def iter_nodes(root):
+    """Recorre todos los nodos del subárbol (preorden, sin recursión)."""
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        yield node
+        pending.extend(reversed(node.children()))
+
+
+def _short_names():
+    for size in count(1):
+        for letters in product(ascii_letters, repeat=size):
+            name = "".join(letters)
+            if name not in JS_SHORT_RESERVED:
+                yield name
+
+
+def _mangle_locals(func, outer_renames):
+    """
+    Calcula los nombres cortos para los parámetros y variables locales de func.
+    Los nombres generados evitan cualquier identificador libre del cuerpo y los
+    nombres ya asignados en scopes exteriores, para no capturar nada por error.
+    """
+    local_names = function_locals(func)
+
+    used = set()
+    _collect_names(func.params, used)
+    _collect_names(func.body, used)
+    taken = (used - set(local_names)) | set(outer_renames.values())
+
+    renames = dict(outer_renames)
+    names = _short_names()
+    for name in local_names:
+        short = next(names)
+        while short in taken:
+            short = next(names)
+        renames[name] = short
+    return renames
+
+
 class ASTNode:
     def to_tree(self, level=0):
         return "  " * level + self.__class__.__name__
 
+    def children(self):
+        """Nodos hijos directos, en orden de aparición en el código."""
+        return []
+
     def to_js(self, indent=0, context=None):
         """
         Genera el código JavaScript equivalente a este nodo.
@@ -71,7 +276,7 @@ class IdentifierNode(ASTNode):
         return "  " * level + f"IdentifierNode({self.name})"
 
     def to_js(self, indent=0, context=None):
-        return self.name
+        return _local_name(self.name, context)
 
 
 class BinOpNode(ASTNode):
@@ -80,6 +285,9 @@ class BinOpNode(ASTNode):
         self.op = op          # 'PLUS', 'MINUS', 'GT', 'EQ', etc.
         self.right = right
     
+    def children(self):
+        return [self.left, self.right]
+
     def __str__(self):
         # Opcional: mostrar el operador real en lugar del token
         op_str = self._op_to_symbol(self.op)
@@ -110,6 +318,17 @@ class BinOpNode(ASTNode):
         op_symbol = self._op_to_symbol(self.op)
         left_js = self.left.to_js(0, context)
         right_js = self.right.to_js(0, context)
+
+        if _layout(context).minified:
+            # Paréntesis sólo donde la precedencia (o la asociatividad
+            # izquierda, para el operando derecho) los hace necesarios
+            precedence = JS_PRECEDENCE.get(self.op, 0)
+            if isinstance(self.left, BinOpNode) and JS_PRECEDENCE.get(self.left.op, 0) < precedence:
+                left_js = f"({left_js})"
+            if isinstance(self.right, BinOpNode) and JS_PRECEDENCE.get(self.right.op, 0) <= precedence:
+                right_js = f"({right_js})"
+            return f"{left_js}{op_symbol}{right_js}"
+
         return f"({left_js} {op_symbol} {right_js})"
 
 
@@ -118,6 +337,9 @@ class AssignNode(ASTNode):
         self.target = target  # IdentifierNode
         self.value = value
     
+    def children(self):
+        return [self.target, self.value]
+
     def __str__(self):
         return f"{self.target} = {self.value}"
     
@@ -140,19 +362,25 @@ class AssignNode(ASTNode):
             name = self.target.to_js(0, context)
 
         value_js = self.value.to_js(0, context)
-        indent_str = " " * (indent * 4)
+        layout = _layout(context)
+        indent_str = layout.unit * indent
+        name_js = _local_name(name, context)
+        eq = layout.eq
 
         if name not in declared:
             declared.add(name)
-            return f"{indent_str}let {name} = {value_js};"
+            return f"{indent_str}let {name_js}{eq}{value_js};"
         else:
-            return f"{indent_str}{name} = {value_js};"
+            return f"{indent_str}{name_js}{eq}{value_js};"
 
 
 class PrintNode(ASTNode):
     def __init__(self, value):
         self.value = value
     
+    def children(self):
+        return [self.value]
+
     def __str__(self):
         return f"print({self.value})"
     
@@ -162,7 +390,7 @@ class PrintNode(ASTNode):
         return result
 
     def to_js(self, indent=0, context=None):
-        indent_str = " " * (indent * 4)
+        indent_str = _layout(context).unit * indent
         value_js = self.value.to_js(0, context)
         # Python print() -> console.log()
         return f"{indent_str}console.log({value_js});"
@@ -174,6 +402,9 @@ class IfNode(ASTNode):
         self.body = body            # lista de nodos
         self.else_body = else_body  # lista de nodos o None
     
+    def children(self):
+        return [self.condition] + self.body + (self.else_body or [])
+
     def __str__(self):
         result = f"if {self.condition}:\n"
         for stmt in self.body:
@@ -201,22 +432,23 @@ class IfNode(ASTNode):
         if context is None:
             context = {}
 
-        indent_str = " " * (indent * 4)
+        layout = _layout(context)
+        minified = layout.minified
+        indent_str = layout.unit * indent
         cond_js = self.condition.to_js(0, context)
+        body_js = _statements_js(self.body, indent + 1, context)
 
-        body_lines = [
-            stmt.to_js(indent + 1, context) for stmt in self.body
-        ]
-        body_js = "\n".join(body_lines)
-
-        code = f"{indent_str}if ({cond_js}) {{\n{body_js}\n{indent_str}}}"
+        if minified:
+            code = f"if({cond_js}){{{body_js}}}"
+        else:
+            code = f"{indent_str}if ({cond_js}) {{\n{body_js}\n{indent_str}}}"
 
         if self.else_body is not None:
-            else_lines = [
-                stmt.to_js(indent + 1, context) for stmt in self.else_body
-            ]
-            else_js = "\n".join(else_lines)
-            code += f" else {{\n{else_js}\n{indent_str}}}"
+            else_js = _statements_js(self.else_body, indent + 1, context)
+            if minified:
+                code += f"else{{{else_js}}}"
+            else:
+                code += f" else {{\n{else_js}\n{indent_str}}}"
 
         return code
 
@@ -226,6 +458,9 @@ class WhileNode(ASTNode):
         self.condition = condition
         self.body = body  # lista de nodos
     
+    def children(self):
+        return [self.condition] + self.body
+
     def __str__(self):
         result = f"while {self.condition}:\n"
         for stmt in self.body:
@@ -245,14 +480,13 @@ class WhileNode(ASTNode):
         if context is None:
             context = {}
 
-        indent_str = " " * (indent * 4)
+        layout = _layout(context)
+        indent_str = layout.unit * indent
         cond_js = self.condition.to_js(0, context)
+        body_js = _statements_js(self.body, indent + 1, context)
 
-        body_lines = [
-            stmt.to_js(indent + 1, context) for stmt in self.body
-        ]
-        body_js = "\n".join(body_lines)
-
+        if layout.minified:
+            return f"while({cond_js}){{{body_js}}}"
         return f"{indent_str}while ({cond_js}) {{\n{body_js}\n{indent_str}}}"
 
 
@@ -260,6 +494,9 @@ class BlockNode(ASTNode):
     def __init__(self, statements):
         self.statements = statements
     
+    def children(self):
+        return list(self.statements)
+
     def __str__(self):
         return "\n".join(str(stmt) for stmt in self.statements)
     
@@ -274,10 +511,7 @@ class BlockNode(ASTNode):
         if context is None:
             context = {"declared_vars": set()}
 
-        lines = [
-            stmt.to_js(indent, context) for stmt in self.statements
-        ]
-        return "\n".join(lines)
+        return _statements_js(self.statements, indent, context)
 
 
 class RangeNode(ASTNode):
@@ -291,6 +525,9 @@ class RangeNode(ASTNode):
         self.stop = stop
         self.step = step if step is not None else NumberNode("1")
     
+    def children(self):
+        return [self.start, self.stop, self.step]
+
     def __str__(self):
         if self.step and not (isinstance(self.step, NumberNode) and self.step.value == 1):
             return f"range({self.start}, {self.stop}, {self.step})"
@@ -310,7 +547,9 @@ class RangeNode(ASTNode):
 
     def to_js(self, indent=0, context=None):
         # No se transpila directamente, se usa en ForNode
-        return f"range({self.start.to_js(0, context)}, {self.stop.to_js(0, context)}, {self.step.to_js(0, context)})"
+        sep = _layout(context).sep
+        args_js = sep.join(arg.to_js(0, context) for arg in (self.start, self.stop, self.step))
+        return f"range({args_js})"
 
 
 class ForNode(ASTNode):
@@ -324,6 +563,9 @@ class ForNode(ASTNode):
         self.iterable = iterable
         self.body = body
     
+    def children(self):
+        return [self.variable, self.iterable] + self.body
+
     def __str__(self):
         result = f"for {self.variable} in {self.iterable}:\n"
         for stmt in self.body:
@@ -345,10 +587,28 @@ class ForNode(ASTNode):
         if context is None:
             context = {}
 
-        indent_str = " " * (indent * 4)
+        # Un reescritor (p.ej. loop_idioms.closed_form_js) puede sustituir el
+        # bucle completo por código equivalente; si devuelve None no aplica
+        rewriter = context.get("loop_rewriter")
+        if rewriter is not None:
+            rewritten = rewriter(self, indent, context)
+            if rewritten is not None:
+                return rewritten
+
+        return self.loop_js(indent, context)
+
+    def loop_js(self, indent=0, context=None):
+        """Genera el bucle for de JavaScript tal cual, sin reescrituras."""
+        if context is None:
+            context = {}
+
+        layout = _layout(context)
+        indent_str = layout.unit * indent
+        minified = layout.minified
         
         # Obtener el nombre de la variable
         var_name = self.variable.name if isinstance(self.variable, IdentifierNode) else str(self.variable)
+        var_js = _local_name(var_name, context)
         
         # Asumimos que iterable es un RangeNode
         if isinstance(self.iterable, RangeNode):
@@ -363,23 +623,27 @@ class ForNode(ASTNode):
             
             # Determinar el incremento
             if isinstance(self.iterable.step, NumberNode) and self.iterable.step.value == 1:
-                increment = f"{var_name}++"
+                increment = f"{var_js}++"
+            elif minified:
+                increment = f"{var_js}+={step_js}"
             else:
-                increment = f"{var_name} += {step_js}"
+                increment = f"{var_js} += {step_js}"
             
             # Marcar la variable como declarada
             declared = context.setdefault("declared_vars", set())
             declared.add(var_name)
             
             # Generar el for de JavaScript
-            header = f"{indent_str}for (let {var_name} = {start_js}; {var_name} {comp_op} {stop_js}; {increment}) {{"
+            if minified:
+                header = f"for(let {var_js}={start_js};{var_js}{comp_op}{stop_js};{increment}){{"
+            else:
+                header = f"{indent_str}for (let {var_js} = {start_js}; {var_js} {comp_op} {stop_js}; {increment}) {{"
             
             # Generar el cuerpo
-            body_lines = [
-                stmt.to_js(indent + 1, context) for stmt in self.body
-            ]
-            body_js = "\n".join(body_lines)
+            body_js = _statements_js(self.body, indent + 1, context)
             
+            if minified:
+                return f"{header}{body_js}}}"
             return f"{header}\n{body_js}\n{indent_str}}}"
         else:
             raise NotImplementedError("Only range() is supported in for loops")
@@ -396,6 +660,9 @@ class FunctionDefNode(ASTNode):
         self.params = params
         self.body = body
     
+    def children(self):
+        return self.params + self.body
+
     def __str__(self):
         params_str = ", ".join(str(p) for p in self.params)
         result = f"def {self.name}({params_str}):\n"
@@ -417,18 +684,30 @@ class FunctionDefNode(ASTNode):
         if context is None:
             context = {}
 
-        indent_str = " " * (indent * 4)
+        layout = _layout(context)
+        indent_str = layout.unit * indent
+        minified = layout.minified
         
         # Marcar la función como declarada en el contexto global
         declared = context.setdefault("declared_vars", set())
         declared.add(self.name)
-        
-        # Parámetros
-        params_js = ", ".join(p.to_js(0, context) for p in self.params)
+        name_js = _local_name(self.name, context)
         
         # CREAR UN NUEVO CONTEXTO LOCAL PARA EL CUERPO DE LA FUNCIÓN
         # Los parámetros ya están declarados en el scope de la función
-        local_context = {"declared_vars": set()}
+        local_context = {"declared_vars": set(), "layout": layout}
+        if minified:
+            local_context["minify"] = True
+        if "loop_rewriter" in context:
+            local_context["loop_rewriter"] = context["loop_rewriter"]
+        if "budget" in context:
+            local_context["budget"] = context["budget"]
+        if context.get("mangle"):
+            local_context["mangle"] = True
+            local_context["renames"] = _mangle_locals(self, context.get("renames", {}))
+        
+        # Parámetros (con los nombres del scope local)
+        params_js = layout.sep.join(p.to_js(0, local_context) for p in self.params)
         
         # Agregar los parámetros como variables ya declaradas en el scope local
         for param in self.params:
@@ -436,12 +715,11 @@ class FunctionDefNode(ASTNode):
                 local_context["declared_vars"].add(param.name)
         
         # Cuerpo de la función con el contexto local
-        body_lines = [
-            stmt.to_js(indent + 1, local_context) for stmt in self.body
-        ]
-        body_js = "\n".join(body_lines)
+        body_js = _statements_js(self.body, indent + 1, local_context)
         
-        return f"{indent_str}function {self.name}({params_js}) {{\n{body_js}\n{indent_str}}}"
+        if minified:
+            return f"function {name_js}({params_js}){{{body_js}}}"
+        return f"{indent_str}function {name_js}({params_js}) {{\n{body_js}\n{indent_str}}}"
 
 
 class FunctionCallNode(ASTNode):
@@ -453,6 +731,9 @@ class FunctionCallNode(ASTNode):
         self.name = name
         self.args = args
     
+    def children(self):
+        return ([self.name] if isinstance(self.name, ASTNode) else []) + self.args
+
     def __str__(self):
         args_str = ", ".join(str(arg) for arg in self.args)
         return f"{self.name}({args_str})"
@@ -466,8 +747,8 @@ class FunctionCallNode(ASTNode):
 
     def to_js(self, indent=0, context=None):
         # Para llamadas a funciones que aparecen como expresiones
-        name_str = self.name if isinstance(self.name, str) else self.name.to_js(0, context)
-        args_js = ", ".join(arg.to_js(0, context) for arg in self.args)
+        name_str = _local_name(self.name, context) if isinstance(self.name, str) else self.name.to_js(0, context)
+        args_js = _layout(context).sep.join([arg.to_js(0, context) for arg in self.args])
         return f"{name_str}({args_js})"
 
 
@@ -478,6 +759,9 @@ class ReturnNode(ASTNode):
         """
         self.value = value
     
+    def children(self):
+        return [self.value] if self.value is not None else []
+
     def __str__(self):
         if self.value:
             return f"return {self.value}"
@@ -490,7 +774,7 @@ class ReturnNode(ASTNode):
         return result
 
     def to_js(self, indent=0, context=None):
-        indent_str = " " * (indent * 4)
+        indent_str = _layout(context).unit * indent
         if self.value:
             value_js = self.value.to_js(0, context)
             return f"{indent_str}return {value_js};"
@@ -0,0 +1,62 @@
+# admission.py
+"""
+Latencia de /compile con tráfico mixto (muchos programas pequeños y algunos
+grandes) compilando en el event loop (COMPILE_WORKERS=0) contra el pool de
+procesos con control de admisión. La caché se desactiva para medir la
+compilación.
+
+Uso (desde backend/):
+    python -m benchmarks.admission
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.programs import generate_program
+from benchmarks.server import running_server, post, percentile
+
+REQUESTS = 300
+CONCURRENCY = 16
+LARGE_FRACTION = 0.1
+
+CONFIGURATIONS = [
+    ("inline (before)", {"COMPILE_WORKERS": "0"}),
+    ("process pool", {}),
+]
+
+
+def workload(seed=0):
+    rng = random.Random(seed)
+    small = generate_program(functions=1, statements=3, seed=seed)
+    large = generate_program(functions=40, statements=25, seed=seed)
+    requests = []
+    for i in range(REQUESTS):
+        kind = "large" if rng.random() < LARGE_FRACTION else "small"
+        source = large if kind == "large" else small
+        requests.append((kind, f"{source}# request {i}\n"))
+    return requests
+
+
+def main():
+    requests = workload()
+    for label, env in CONFIGURATIONS:
+        env = {"COMPILE_CACHE_ENTRIES": "0", **env}
+        with running_server(env) as url:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(CONCURRENCY) as pool:
+                results = list(pool.map(
+                    lambda item: (item[0],) + post(f"{url}/compile", {"code": item[1]}), requests
+                ))
+            elapsed = time.perf_counter() - start
+
+        print(f"{label}: {len(results) / elapsed:.1f} req/s")
+        for kind in ("small", "large"):
+            latencies = sorted(seconds for k, status, seconds in results if k == kind and status == 200)
+            rejected = sum(1 for k, status, _ in results if k == kind and status == 503)
+            print(f"  {kind:<6} p50 {percentile(latencies, 0.5) * 1000:8.2f} ms  "
+                  f"p99 {percentile(latencies, 0.99) * 1000:8.2f} ms  503s: {rejected}")
+
+
+if __name__ == "__main__":
+    main()
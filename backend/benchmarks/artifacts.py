@@ -0,0 +1,43 @@
+# artifacts.py
+"""
+Latencia del pipeline de /compile según los artefactos pedidos.
+
+Uso (desde backend/):
+    python -m benchmarks.artifacts
+"""
+
+import time
+
+from pipeline import ARTIFACTS, compile_payload
+from benchmarks.programs import generate_program
+
+REQUESTS = [
+    ("all", ARTIFACTS),
+    ("tokens", ("tokens",)),
+    ("output", ("output",)),
+    ("ast", ("ast",)),
+    ("javascript", ("javascript",)),
+]
+
+
+def best_time(func, repeat=10):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    source = generate_program(functions=100, statements=25)
+    print(f"{len(source.splitlines())} lines of MiniPython")
+    baseline = None
+    for label, artifacts in REQUESTS:
+        elapsed = best_time(lambda: compile_payload(source, artifacts=artifacts))
+        baseline = baseline or elapsed
+        print(f"  {label:<11} {elapsed * 1000:8.2f} ms  ({elapsed / baseline:.0%} of all)")
+
+
+if __name__ == "__main__":
+    main()
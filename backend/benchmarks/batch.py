@@ -0,0 +1,39 @@
+# batch.py
+"""
+Programas por segundo: una llamada a /compile por programa (secuencial)
+contra una sola llamada a /compile/batch, con y sin streaming. La caché se
+desactiva para medir la compilación.
+
+Uso (desde backend/):
+    python -m benchmarks.batch
+"""
+
+import time
+
+from benchmarks.programs import generate_program
+from benchmarks.server import running_server, post
+
+PROGRAMS = 500
+
+
+def main():
+    sources = [generate_program(functions=2, statements=5, seed=i) for i in range(PROGRAMS)]
+    batch = [{"id": str(i), "code": source} for i, source in enumerate(sources)]
+
+    with running_server({"COMPILE_CACHE_ENTRIES": "0"}) as url:
+        start = time.perf_counter()
+        statuses = [post(f"{url}/compile", {"code": source})[0] for source in sources]
+        sequential = time.perf_counter() - start
+        assert set(statuses) == {200}, statuses
+
+        _, batched = post(f"{url}/compile/batch", {"programs": batch})
+        _, streamed = post(f"{url}/compile/batch", {"programs": batch, "stream": True})
+
+    print(f"{PROGRAMS} programs of {len(sources[0].splitlines())} lines")
+    for label, seconds in (("sequential /compile", sequential), ("/compile/batch", batched),
+                           ("/compile/batch stream", streamed)):
+        print(f"  {label:<22} {seconds:7.2f} s  {PROGRAMS / seconds:8.1f} programs/s")
+
+
+if __name__ == "__main__":
+    main()
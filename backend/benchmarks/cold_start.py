@@ -0,0 +1,93 @@
+# cold_start.py
+"""
+Tiempo hasta la primera compilación exitosa de un servidor recién lanzado:
+desde que se lanza uvicorn hasta que responde en / (listo) y hasta que
+/compile responde 200 a un programa que va al pool de procesos, más la
+latencia de esa primera compilación y la de la siguiente. También mide
+cuánto tarda `import main`.
+
+Uso (desde backend/):
+    python -m benchmarks.cold_start [corridas]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from benchmarks.programs import generate_program
+from benchmarks.server import PORT, post
+
+CONFIGURATIONS = [
+    ("no warm-up", {"COMPILE_WARMUP": "0"}),
+    ("warm-up", {}),
+]
+
+
+def import_seconds():
+    """Segundos de `import main` en un intérprete nuevo."""
+    output = subprocess.run(
+        [sys.executable, "-c",
+         "import time; start = time.perf_counter(); import main; print(time.perf_counter() - start)"],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return float(output)
+
+
+def first_compile(env, source):
+    """
+    Devuelve (segundos hasta que el servidor responde en /, segundos hasta
+    el primer 200 de /compile, latencia de ese pedido, latencia del siguiente).
+    """
+    url = f"http://127.0.0.1:{PORT}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--log-level", "warning"],
+        env={**os.environ, **env},
+    )
+    try:
+        # Como un health check: el servidor está listo cuando responde
+        while True:
+            try:
+                with urllib.request.urlopen(f"{url}/", timeout=1) as response:
+                    response.read()
+                break
+            except OSError:
+                if time.perf_counter() - start > 60:
+                    raise RuntimeError("Server did not start")
+                time.sleep(0.005)
+        ready = time.perf_counter() - start
+        status, first = post(f"{url}/compile", {"code": source})
+        if status != 200:
+            raise RuntimeError(f"/compile answered {status}")
+        compiled = time.perf_counter() - start
+        # El mismo código vendría de la caché: el segundo pedido lleva otro comentario
+        _, second = post(f"{url}/compile", {"code": source + "# second\n"})
+        return ready, compiled, first, second
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    # Más grande que COMPILE_INLINE_MAX_BYTES, así que se compila en el pool
+    source = generate_program(functions=20, statements=20)
+    imports = [import_seconds() for _ in range(runs)]
+    print(f"import main: median {statistics.median(imports) * 1000:.0f} ms")
+    # Las configuraciones se alternan para que una deriva de la máquina no
+    # favorezca a ninguna
+    results = {label: [] for label, _ in CONFIGURATIONS}
+    for _ in range(runs):
+        for label, env in CONFIGURATIONS:
+            results[label].append(first_compile(env, source))
+    for label, _ in CONFIGURATIONS:
+        ready, compiled, first, second = (statistics.median(values) for values in zip(*results[label]))
+        print(f"{label:<11} ready {ready * 1000:6.0f} ms, first compile done {compiled * 1000:6.0f} ms  "
+              f"(first compile {first * 1000:5.1f} ms, next {second * 1000:5.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
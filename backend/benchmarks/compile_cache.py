@@ -0,0 +1,58 @@
+# compile_cache.py
+"""
+Prueba de carga de la caché de /compile: levanta el servidor con uvicorn y
+envía peticiones con distintas tasas de acierto, con la caché activada y
+desactivada (COMPILE_CACHE_ENTRIES=0).
+
+Uso (desde backend/):
+    python -m benchmarks.compile_cache
+"""
+
+import json
+import random
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.programs import generate_program
+from benchmarks.server import running_server, post, percentile
+
+REQUESTS = 400
+CONCURRENCY = 8
+
+
+def workload(hit_rate, seed=0):
+    """Programas a enviar: una fracción hit_rate repite plantillas conocidas."""
+    rng = random.Random(seed)
+    templates = [generate_program(functions=10, statements=20, seed=s) for s in range(5)]
+    requests = []
+    for i in range(REQUESTS):
+        template = rng.choice(templates)
+        if rng.random() < hit_rate:
+            requests.append(template)
+        else:
+            # Un comentario distinto cambia el hash: siempre es un fallo
+            requests.append(f"{template}# submission {i}\n")
+    return requests
+
+
+def measure(url, hit_rate):
+    requests = workload(hit_rate)
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        results = pool.map(lambda code: post(f"{url}/compile", {"code": code}), requests)
+        latencies = sorted(seconds for _, seconds in results)
+    return percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000
+
+
+def main():
+    for label, env in (("cache off", {"COMPILE_CACHE_ENTRIES": "0"}), ("cache on", {})):
+        with running_server(env) as url:
+            for hit_rate in (0.0, 0.5, 0.9):
+                p50, p99 = measure(url, hit_rate)
+                print(f"{label:<10} hit rate {hit_rate:.0%}: p50 {p50:7.2f} ms  p99 {p99:7.2f} ms")
+            stats = json.load(urllib.request.urlopen(f"{url}/cache/stats"))
+            print(f"{'':<10} stats: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['evictions']} evictions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# execution.py
+"""
+Compara los backends de ejecución contra la evaluación ingenua recorriendo
+el AST: la VM de bytecode (vm.py) y los code objects de Python (pybackend.py).
+
+Uso (desde backend/):
+    python -m benchmarks.execution
+"""
+
+import time
+
+from lexer import Lexer
+from parser import Parser
+from bytecode import compile_program
+from vm import VM
+from pybackend import PyCompiler, execute
+from benchmarks.programs import generate_program
+from benchmarks.tree_walker import TreeWalker
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    for functions in (50, 200, 800):
+        source = generate_program(functions=functions, statements=25)
+        ast = Parser(Lexer(source)).parse()
+
+        tree_output, tree_time = timed(lambda: TreeWalker().run(ast))
+
+        code, vm_compile_time = timed(lambda: compile_program(ast))
+        vm = VM(max_steps=None)
+        vm_output, vm_time = timed(lambda: vm.run(code))
+        assert vm_output == tree_output
+
+        code_obj, py_compile_time = timed(lambda: PyCompiler(ast).compile())
+        py_output, py_time = timed(lambda: execute(code_obj, timeout=60))
+        assert py_output == tree_output
+
+        print(f"{functions} functions, {vm.steps} VM instructions")
+        print(f"  {'backend':<12} {'compile':>10} {'run':>10} {'vs tree':>8}")
+        print(f"  {'tree walker':<12} {'-':>10} {tree_time * 1000:>8.2f}ms {'1.00x':>8}")
+        print(f"  {'bytecode vm':<12} {vm_compile_time * 1000:>8.2f}ms {vm_time * 1000:>8.2f}ms "
+              f"{tree_time / vm_time:>7.2f}x")
+        print(f"  {'python code':<12} {py_compile_time * 1000:>8.2f}ms {py_time * 1000:>8.2f}ms "
+              f"{tree_time / py_time:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
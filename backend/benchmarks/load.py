@@ -0,0 +1,323 @@
+# load.py
+"""
+Prueba de carga de /compile: levanta la API localmente y le envía una mezcla
+configurable de programas pequeños, grandes y con errores, con concurrencia y
+tasa de pedidos controladas.
+
+Uso (desde backend/):
+    python -m benchmarks.load [--requests 500] [--concurrency 8] [--rate 0]
+                              [--mix small=80,large=10,error=10] [--workers N]
+                              [--in-process] [--reuse] [--save run.json]
+                              [--baseline previous.json]
+
+Informa throughput, latencias p50/p95/p99 (total y por tipo de programa),
+tasa de errores y memoria residente (RSS) del servidor y sus procesos hijos.
+La carga depende sólo de --seed, así que dos corridas con los mismos
+parámetros son comparables; con --baseline termina con código 1 si el
+throughput bajó, la latencia p99 subió o aparecieron errores más allá de los
+umbrales.
+
+Con --rate R los pedidos se lanzan a R por segundo (carga abierta) y la
+latencia se mide desde el momento en que el pedido debía salir, así una cola
+en el servidor no queda oculta por un cliente que espera. Sin --rate cada
+uno de los --concurrency clientes manda su siguiente pedido en cuanto recibe
+la respuesta anterior.
+"""
+
+import argparse
+import contextlib
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.programs import generate_program, generate_shaped_program
+from benchmarks.server import PORT, running_server, percentile
+
+# Tipo de programa -> (generador(seed), status esperado)
+KINDS = {
+    "small": (lambda seed: generate_program(functions=1, statements=3, seed=seed), 200),
+    "medium": (lambda seed: generate_program(functions=10, statements=15, seed=seed), 200),
+    "large": (lambda seed: generate_shaped_program(lines=3000, seed=seed), 200),
+    "error": (lambda seed: generate_program(functions=1, statements=3, seed=seed) + "x = (1 +\n", 400),
+}
+DEFAULT_MIX = "small=80,large=10,error=10"
+RSS_SAMPLE_SECONDS = 0.2
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise argparse.ArgumentTypeError(f"unknown program kind {kind!r}, expected one of {sorted(KINDS)}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def workload(count, mix, seed, reuse):
+    """
+    Lista de (tipo, código) determinista para una semilla. Salvo con reuse,
+    cada pedido lleva un comentario distinto para que la caché de resultados
+    no los responda.
+    """
+    rng = random.Random(seed)
+    sources = {kind: KINDS[kind][0](seed) for kind in mix}
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    if reuse:
+        return [(kind, sources[kind]) for kind in kinds]
+    return [(kind, f"{sources[kind]}# request {i}\n") for i, kind in enumerate(kinds)]
+
+
+def process_tree_rss(pid):
+    """RSS en bytes de pid y todos sus descendientes (Linux, vía /proc); None si no se puede leer."""
+    children = {}
+    try:
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat") as stat:
+                        # El nombre del proceso puede tener espacios: se corta después del ')'
+                        parent = int(stat.read().rpartition(")")[2].split()[1])
+                except OSError:
+                    continue
+                children.setdefault(parent, []).append(int(entry))
+    except OSError:
+        return None
+    total = 0
+    pending = [pid]
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/statm") as statm:
+                total += int(statm.read().split()[1]) * page_size
+        except OSError:
+            continue
+        pending.extend(children.get(current, ()))
+    return total
+
+
+class RssSampler(threading.Thread):
+    """Mide periódicamente el RSS del árbol de procesos del servidor y guarda el máximo."""
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.pid = None
+        self.peak = None
+        self.last = None
+        self.stopped = threading.Event()
+
+    def sample(self):
+        if self.pid is None:
+            return
+        rss = process_tree_rss(self.pid)
+        if rss is not None:
+            self.last = rss
+            self.peak = max(self.peak or 0, rss)
+
+    def run(self):
+        while not self.stopped.wait(RSS_SAMPLE_SECONDS):
+            self.sample()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+
+
+class Client:
+    """Una conexión keep-alive por hilo, como haría un cliente HTTP real."""
+    def __init__(self, port):
+        self.port = port
+        self.local = threading.local()
+
+    def post(self, path, body):
+        """POST JSON; devuelve el status, o None si falló la conexión."""
+        for _ in range(2):
+            connection = getattr(self.local, "connection", None)
+            if connection is None:
+                connection = self.local.connection = http.client.HTTPConnection("127.0.0.1", self.port)
+            try:
+                connection.request("POST", path, body, {"Content-Type": "application/json"})
+                response = connection.getresponse()
+                response.read()
+                return response.status
+            except (OSError, http.client.HTTPException):
+                # El servidor pudo cerrar la conexión inactiva: se reintenta una vez con otra
+                connection.close()
+                self.local.connection = None
+        return None
+
+
+def run_load(port, requests, concurrency, rate):
+    """Devuelve ([(tipo, status, segundos)], segundos totales)."""
+    client = Client(port)
+    bodies = [(kind, json.dumps({"code": code}).encode("utf-8")) for kind, code in requests]
+    start = time.perf_counter()
+
+    def send(item):
+        index, (kind, body) = item
+        if rate:
+            scheduled = start + index / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            scheduled = time.perf_counter()
+        status = client.post("/compile", body)
+        return kind, status, time.perf_counter() - scheduled
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(send, enumerate(bodies)))
+    return results, time.perf_counter() - start
+
+
+def summarize(results, elapsed):
+    expected = {kind: status for kind, (_, status) in KINDS.items()}
+
+    def latency_stats(rows):
+        latencies = sorted(seconds for _, _, seconds in rows)
+        failed = sum(1 for kind, status, _ in rows if status != expected[kind])
+        return {
+            "requests": len(rows),
+            "p50_ms": percentile(latencies, 0.5) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "error_rate": failed / len(rows) if rows else 0.0,
+        }
+
+    summary = latency_stats(results)
+    summary["throughput"] = len(results) / elapsed
+    summary["statuses"] = {}
+    for _, status, _ in results:
+        key = str(status) if status is not None else "connection_error"
+        summary["statuses"][key] = summary["statuses"].get(key, 0) + 1
+    summary["kinds"] = {
+        kind: latency_stats([row for row in results if row[0] == kind])
+        for kind in sorted({kind for kind, _, _ in results})
+    }
+    return summary
+
+
+def compare(summary, baseline, throughput_threshold, latency_threshold, error_threshold):
+    """Devuelve la lista de regresiones respecto de un resumen anterior."""
+    regressions = []
+    if summary["throughput"] < baseline["throughput"] * (1 - throughput_threshold):
+        regressions.append(f"throughput {baseline['throughput']:.1f} -> {summary['throughput']:.1f} req/s")
+    if summary["p99_ms"] > baseline["p99_ms"] * (1 + latency_threshold):
+        regressions.append(f"p99 {baseline['p99_ms']:.1f} -> {summary['p99_ms']:.1f} ms")
+    if summary["error_rate"] > baseline["error_rate"] + error_threshold:
+        regressions.append(f"error rate {baseline['error_rate']:.2%} -> {summary['error_rate']:.2%}")
+    return regressions
+
+
+def print_summary(summary):
+    print(f"{summary['requests']} requests, {summary['throughput']:.1f} req/s, "
+          f"error rate {summary['error_rate']:.2%}, statuses {summary['statuses']}")
+    print(f"  {'':<8} {'count':>6} {'p50':>10} {'p95':>10} {'p99':>10}")
+    for label, stats in [("all", summary)] + list(summary["kinds"].items()):
+        print(f"  {label:<8} {stats['requests']:>6} {stats['p50_ms']:8.2f}ms "
+              f"{stats['p95_ms']:8.2f}ms {stats['p99_ms']:8.2f}ms")
+    if summary["rss_peak_bytes"] is not None:
+        print(f"  server RSS: peak {summary['rss_peak_bytes'] / 2 ** 20:.1f} MiB, "
+              f"end {summary['rss_end_bytes'] / 2 ** 20:.1f} MiB")
+
+
+def serve_in_process(port):
+    """Arranca main:app en un hilo de este mismo proceso; devuelve el servidor de uvicorn."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config("main:app", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if server.started:
+            return server, thread
+        time.sleep(0.1)
+    raise RuntimeError("Server did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--requests", type=int, default=500, help="total requests to send")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent client connections")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="requests per second, 0 to send as fast as the clients can")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"weights per program kind among {sorted(KINDS)} (default {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reuse", action="store_true",
+                        help="send identical sources, so the result cache answers repeats")
+    parser.add_argument("--workers", type=int, default=None, help="uvicorn worker processes")
+    parser.add_argument("--in-process", action="store_true",
+                        help="serve from a thread of this process instead of a uvicorn subprocess")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--save", help="write the summary to this JSON file")
+    parser.add_argument("--baseline", help="compare against a summary saved with --save")
+    parser.add_argument("--throughput-threshold", type=float, default=0.10,
+                        help="allowed relative drop in throughput (default 0.10)")
+    parser.add_argument("--latency-threshold", type=float, default=0.20,
+                        help="allowed relative growth of p99 latency (default 0.20)")
+    parser.add_argument("--error-threshold", type=float, default=0.0,
+                        help="allowed absolute growth of the error rate (default 0)")
+    args = parser.parse_args(argv)
+    if args.in_process and args.workers:
+        parser.error("--in-process and --workers are exclusive")
+
+    requests = workload(args.requests, args.mix, args.seed, args.reuse)
+    sampler = RssSampler()
+    if args.in_process:
+        # La memoria medida incluye también a los clientes de este proceso
+        server, thread = serve_in_process(args.port)
+        sampler.pid = os.getpid()
+        try:
+            # El servidor imprime cada error de compilación en stdout
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                sampler.start()
+                results, elapsed = run_load(args.port, requests, args.concurrency, args.rate)
+                sampler.stop()
+        finally:
+            server.should_exit = True
+            thread.join()
+    else:
+        def watch(process):
+            sampler.pid = process.pid
+
+        with running_server(workers=args.workers, port=args.port, on_start=watch, quiet=True):
+            sampler.start()
+            results, elapsed = run_load(args.port, requests, args.concurrency, args.rate)
+            sampler.stop()
+
+    summary = summarize(results, elapsed)
+    summary["rss_peak_bytes"] = sampler.peak
+    summary["rss_end_bytes"] = sampler.last
+    summary["parameters"] = {
+        key: getattr(args, key)
+        for key in ("requests", "concurrency", "rate", "mix", "seed", "reuse", "workers", "in_process")
+    }
+    print_summary(summary)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2, sort_keys=True)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    if baseline["parameters"] != summary["parameters"]:
+        print("warning: the baseline was recorded with different parameters", file=sys.stderr)
+    regressions = compare(summary, baseline, args.throughput_threshold,
+                          args.latency_threshold, args.error_threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
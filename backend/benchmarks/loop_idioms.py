@@ -0,0 +1,148 @@
+# loop_idioms.py
+"""
+Mide el efecto de la reescritura de bucles en forma cerrada (optimize_loops)
+ejecutando el JavaScript generado con Node.js para valores grandes de n.
+Con --check compara en cambio la salida de programas aleatorios compilados
+con y sin minify y optimize_loops, y termina con código 1 si alguna
+combinación difiere del bucle sin optimizar.
+
+Uso (desde backend/, requiere `node` en el PATH):
+    python -m benchmarks.loop_idioms
+    python -m benchmarks.loop_idioms --check [programas]
+"""
+
+import json
+import random
+import subprocess
+import sys
+
+from lexer import Lexer
+from parser import Parser
+from transpiler import Transpiler
+
+PROGRAM = """total = 0
+matches = 0
+n = {n}
+limit = {limit}
+for i in range(n):
+    total = total + 2 * i + 1
+    if i > limit:
+        matches = matches + 1
+print(total)
+print(matches)
+"""
+
+
+def run_node(js_code):
+    """Ejecuta js_code y devuelve (salida, milisegundos medidos dentro de Node)."""
+    script = (
+        "const __start = performance.now();\n"
+        f"{js_code}\n"
+        "console.error(performance.now() - __start);\n"
+    )
+    result = subprocess.run(["node", "-e", script], capture_output=True, text=True, check=True)
+    return result.stdout, float(result.stderr.strip().splitlines()[-1])
+
+
+def literal(value):
+    # MiniPython no tiene menos unario
+    return str(value) if value >= 0 else f"0 - {-value}"
+
+
+def random_expression(rng, names, depth):
+    """Expresión entera con +, - y * (y paréntesis) sobre names y constantes."""
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(names) if rng.random() < 0.6 else str(rng.randint(0, 9))
+    op = rng.choice(("+", "-", "*"))
+    left = random_expression(rng, names, depth - 1)
+    right = random_expression(rng, names, depth - 1)
+    return f"({left} {op} {right})" if rng.random() < 0.5 else f"{left} {op} {right}"
+
+
+def random_loop_program(rng):
+    """Un bucle de acumuladores como los que reconoce loop_idioms, o casi."""
+    invariants = ["x", "y", "z"]
+    lines = [f"{name} = {literal(rng.randint(-5, 9))}" for name in invariants]
+    accumulators = [f"acc{k}" for k in range(rng.randint(1, 3))]
+    lines += [f"{name} = {literal(rng.randint(-3, 3))}" for name in accumulators]
+    start, stop = literal(rng.randint(-5, 5)), rng.choice(["x + 20", "y * 3", str(rng.randint(0, 30))])
+    step = rng.choice(["", ", 1", ", 2", ", 3"])
+    lines.append(f"for i in range({start}, {stop}{step}):")
+    # Cuerpos sin actualizaciones: sólo un comentario, o un if vacío
+    body = rng.random()
+    if body < 0.05:
+        lines.append("    # nothing yet")
+        accumulators_updated = []
+    elif body < 0.1:
+        lines.append(f"    if i > {random_expression(rng, invariants, 1)}:")
+        lines.append("        # later")
+        accumulators_updated = accumulators if rng.random() < 0.5 else []
+    else:
+        accumulators_updated = accumulators
+    for name in accumulators_updated:
+        if rng.random() < 0.2:
+            update = f"{name} = {name} * {random_expression(rng, invariants, 1)}"
+        else:
+            term = random_expression(rng, invariants + ["i"], 2)
+            update = f"{name} = {name} {rng.choice(('+', '-'))} {term}"
+        if rng.random() < 0.3:
+            comparison = rng.choice((">", "<", ">=", "<=", "=="))
+            lines.append(f"    if i {comparison} {random_expression(rng, invariants, 1)}:")
+            lines.append(f"        {update}")
+        else:
+            lines.append(f"    {update}")
+    lines += [f"print({name})" for name in accumulators]
+    return "\n".join(lines) + "\n"
+
+
+VARIANTS = ((False, False), (True, False), (False, True), (True, True))
+
+
+def check(programs):
+    """Cantidad de programas cuya salida cambia con minify u optimize_loops."""
+    rng = random.Random(0)
+    sources = [random_loop_program(rng) for _ in range(programs)]
+    # Un solo proceso de Node: cada variante corre en su propia función y
+    # su salida se separa con un marcador. new Function convierte un error
+    # de sintaxis de una variante en una salida distinta, en vez de
+    # impedir que corra el script entero.
+    blocks = []
+    for source in sources:
+        ast = Parser(Lexer(source)).parse()
+        for minify, optimize_loops in VARIANTS:
+            js_code = Transpiler(ast, minify=minify, optimize_loops=optimize_loops).transpile()
+            blocks.append(
+                f"try {{ new Function({json.dumps(js_code)})(); }} "
+                f"catch (e) {{ console.log('ERROR ' + e); }}\nconsole.log('--');"
+            )
+    output = subprocess.run(
+        ["node"], input="\n".join(blocks), capture_output=True, text=True, check=True
+    ).stdout.split("--\n")
+
+    failures = 0
+    for number, source in enumerate(sources):
+        expected, *variants = output[number * len(VARIANTS):(number + 1) * len(VARIANTS)]
+        for (minify, optimize_loops), result in zip(VARIANTS[1:], variants):
+            if result != expected:
+                failures += 1
+                print(f"MISMATCH minify={minify} optimize_loops={optimize_loops}\n{source}", file=sys.stderr)
+                break
+    print(f"{programs} programs, {failures} mismatches")
+    return 1 if failures else 0
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--check":
+        return check(int(sys.argv[2]) if len(sys.argv) > 2 else 1000)
+    print(f"{'n':>12} {'loop':>12} {'closed form':>12}")
+    for n in (10 ** 3, 10 ** 5, 10 ** 7, 10 ** 8):
+        ast = Parser(Lexer(PROGRAM.format(n=n, limit=n // 3))).parse()
+        loop_out, loop_ms = run_node(Transpiler(ast).transpile())
+        fast_out, fast_ms = run_node(Transpiler(ast, optimize_loops=True).transpile())
+        assert loop_out == fast_out
+        print(f"{n:>12} {loop_ms:>10.3f}ms {fast_ms:>10.3f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
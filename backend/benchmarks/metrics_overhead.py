@@ -0,0 +1,59 @@
+# metrics_overhead.py
+"""
+Costo de la instrumentación de /compile: pipeline sin medir contra
+compile_with_metrics (tiempos por etapa y conteo de nodos), más el costo de
+registrar las métricas y exportarlas.
+
+Uso (desde backend/):
+    python -m benchmarks.metrics_overhead
+"""
+
+import time
+
+import metrics
+from lexer import Lexer
+from parser import Parser
+from transpiler import Transpiler
+from pipeline import compile_with_metrics
+from benchmarks.programs import generate_program
+from benchmarks.artifacts import best_time
+
+SIZES = [(5, 10), (50, 25), (200, 25)]
+
+
+def uninstrumented(source):
+    tokens = Lexer(source)
+    ast = Parser(tokens).parse()
+    return {
+        "tokens": [str(token) for token in tokens],
+        "output": str(ast),
+        "ast": ast.to_tree(),
+        "javascript": Transpiler(ast).transpile(),
+    }
+
+
+def record(stats):
+    for stage, seconds in stats["stages"].items():
+        metrics.stage_duration.observe(seconds, stage)
+    metrics.token_count.observe(stats["tokens"])
+    metrics.node_count.observe(stats["nodes"])
+
+
+def main():
+    for functions, statements in SIZES:
+        source = generate_program(functions=functions, statements=statements)
+        plain = best_time(lambda: uninstrumented(source))
+        measured = best_time(lambda: record(compile_with_metrics(source)[1]))
+        print(
+            f"{len(source.splitlines()):6} lines  plain {plain * 1000:8.2f} ms  "
+            f"instrumented {measured * 1000:8.2f} ms  ({measured / plain - 1:+.1%})"
+        )
+
+    start = time.perf_counter()
+    for _ in range(100):
+        metrics.registry.render()
+    print(f"/metrics render: {(time.perf_counter() - start) * 10:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
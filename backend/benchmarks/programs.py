@@ -0,0 +1,159 @@
+# programs.py
+"""
+Generador determinista de programas MiniPython para los benchmarks.
+"""
+
+import random
+
+
+def generate_program(functions=20, statements=20, seed=0):
+    """
+    Devuelve el código fuente de un programa con `functions` funciones de
+    `statements` sentencias cada una, más un bloque principal que las llama.
+    La misma semilla siempre produce el mismo programa.
+    """
+    rng = random.Random(seed)
+    lines = []
+
+    for f in range(functions):
+        lines.append(f"def func{f}(alpha, beta):")
+        lines.append("    total = alpha")
+        for s in range(statements):
+            kind = rng.randrange(4)
+            if kind == 0:
+                lines.append(f"    total = total + beta * {rng.randrange(1, 9)} - (alpha - {s})")
+            elif kind == 1:
+                lines.append(f"    if total > {rng.randrange(100)}:")
+                lines.append(f"        total = total - {rng.randrange(1, 9)}")
+                lines.append("    else:")
+                lines.append("        total = total + 1")
+            elif kind == 2:
+                lines.append(f"    for counter in range({rng.randrange(1, 5)}):")
+                lines.append("        total = total + counter")
+            else:
+                lines.append(f"    while total < {rng.randrange(10, 50)}:")
+                lines.append("        total = total + 2")
+        lines.append("    return total")
+
+    lines.append("result = 0")
+    for f in range(functions):
+        lines.append(f"result = result + func{f}({f}, {rng.randrange(1, 9)})")
+    lines.append("print(result)")
+    return "\n".join(lines) + "\n"
+
+
+OPERATORS = ("+", "-", "*")
+COMPARISONS = (">", "<", ">=", "<=", "==", "!=")
+WORDS = ("alpha", "beta", "gamma", "delta", "epsilon", "lambda", "sigma", "omega")
+
+
+class _ProgramWriter:
+    """Estado de generate_shaped_program mientras escribe un programa."""
+    def __init__(self, rng, nesting, expression_depth, string_density):
+        self.rng = rng
+        self.nesting = nesting
+        self.expression_depth = expression_depth
+        self.string_density = string_density
+        self.lines = []
+        self.loops = 0
+
+    def expression(self, names, depth):
+        """Expresión aritmética de exactamente `depth` niveles de operadores."""
+        if depth == 0:
+            if self.rng.random() < 0.5:
+                return self.rng.choice(names)
+            return str(self.rng.randrange(1, 100))
+        left = self.expression(names, depth - 1)
+        right = self.expression(names, self.rng.randrange(depth))
+        text = f"{left} {self.rng.choice(OPERATORS)} {right}"
+        # Los paréntesis fuerzan el anidamiento en el parser
+        return f"({text})" if self.rng.random() < 0.5 else text
+
+    def string(self):
+        words = self.rng.sample(WORDS, self.rng.randrange(1, 4))
+        return '"' + " ".join(words) + '"'
+
+    def simple(self, indent, names):
+        pad = "    " * indent
+        if self.rng.random() < self.string_density:
+            if self.rng.random() < 0.5:
+                self.lines.append(f"{pad}print({self.string()})")
+            else:
+                self.lines.append(f"{pad}label = label + {self.string()}")
+        else:
+            target = self.rng.choice(names[:1] + ["total"])
+            self.lines.append(f"{pad}{target} = {self.expression(names, self.expression_depth)}")
+
+    def block(self, indent, depth, names):
+        """
+        Sentencia compuesta (if/else, while o for) cuyo cuerpo vuelve a
+        anidar hasta `nesting` niveles. Sólo la primera sentencia de cada
+        cuerpo anida, así que las líneas crecen linealmente con la profundidad.
+        """
+        pad = "    " * indent
+        kind = self.rng.randrange(3)
+        condition = f"total {self.rng.choice(COMPARISONS)} {self.expression(names, 1)}"
+        if kind == 0:
+            self.lines.append(f"{pad}if {condition}:")
+        elif kind == 1:
+            self.lines.append(f"{pad}while {condition}:")
+        else:
+            self.loops += 1
+            variable = f"i{self.loops}"
+            names = names + [variable]
+            self.lines.append(f"{pad}for {variable} in range({self.rng.randrange(1, 10)}):")
+        self.body(indent + 1, depth + 1, names)
+        if kind == 0 and self.rng.random() < 0.5:
+            self.lines.append(f"{pad}else:")
+            self.body(indent + 1, depth + 1, names)
+        elif kind == 1:
+            self.lines.append(f"{pad}    total = total + 1")
+
+    def body(self, indent, depth, names):
+        if depth < self.nesting:
+            self.block(indent, depth, names)
+        for _ in range(self.rng.randrange(1, 3)):
+            self.simple(indent, names)
+
+    def statements(self, indent, names, line_budget):
+        end = len(self.lines) + line_budget
+        while len(self.lines) < end:
+            if self.nesting and self.rng.random() < 0.3:
+                self.block(indent, 0, names)
+            else:
+                self.simple(indent, names)
+
+
+def generate_shaped_program(lines=1000, nesting=3, expression_depth=3, functions=10,
+                            string_density=0.1, seed=0):
+    """
+    Devuelve un programa de unas `lines` líneas con una forma controlada:
+
+    nesting: niveles de if/while/for anidados que alcanza cada bloque
+    expression_depth: niveles de operadores de cada expresión aritmética
+    functions: cantidad de funciones; las líneas se reparten entre ellas y
+               el bloque principal
+    string_density: fracción (0 a 1) de sentencias que trabajan con strings
+
+    La misma combinación de parámetros y semilla siempre produce el mismo
+    programa.
+    """
+    rng = random.Random(seed)
+    writer = _ProgramWriter(rng, nesting, expression_depth, string_density)
+    share = max(1, lines // (functions + 1))
+
+    for f in range(functions):
+        writer.lines.append(f"def func{f}(alpha, beta):")
+        writer.lines.append("    total = alpha")
+        writer.lines.append('    label = ""')
+        writer.statements(1, ["alpha", "beta", "total"], share - 4)
+        writer.lines.append("    return total")
+
+    writer.lines.append("total = 0")
+    writer.lines.append('label = ""')
+    for f in range(functions):
+        writer.lines.append(f"total = total + func{f}({f}, {writer.expression(['total'], 1)})")
+    writer.statements(0, ["total"], lines - len(writer.lines) - 2)
+    writer.lines.append("print(total)")
+    writer.lines.append("print(label)")
+    return "\n".join(writer.lines) + "\n"
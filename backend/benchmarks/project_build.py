@@ -0,0 +1,55 @@
+# project_build.py
+"""
+Tiempos de compiler_cli sobre un árbol de 10k archivos .mpy: build completo
+con 1 proceso y con uno por CPU, build sin cambios y build con un archivo
+modificado.
+
+Uso (desde backend/):
+    python -m benchmarks.project_build [cantidad de archivos]
+"""
+
+import os
+import sys
+import tempfile
+
+from compiler_cli import build
+from benchmarks.programs import generate_program
+
+OPTIONS = {"minify": False, "mangle": False, "optimize_loops": False}
+FILES_PER_DIRECTORY = 100
+
+
+def make_tree(root, count):
+    for i in range(count):
+        directory = os.path.join(root, f"pkg{i // FILES_PER_DIRECTORY}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"mod{i}.mpy"), "w") as source:
+            source.write(generate_program(functions=2, statements=5, seed=i))
+
+
+def report(label, summary):
+    timings = summary["timings"]
+    print(f"  {label:<24} {timings['total'] * 1000:9.1f} ms  "
+          f"({summary['compiled']} compiled, {summary['up_to_date']} up to date)")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    cpus = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as root:
+        source_dir = os.path.join(root, "src")
+        make_tree(source_dir, count)
+        print(f"{count} files, {cpus} CPUs")
+
+        report("full build, 1 process", build(source_dir, os.path.join(root, "out1"), OPTIONS, jobs=1))
+        output_dir = os.path.join(root, "out")
+        report(f"full build, {cpus} processes", build(source_dir, output_dir, OPTIONS, jobs=cpus))
+        report("no-op build", build(source_dir, output_dir, OPTIONS))
+
+        with open(os.path.join(source_dir, "pkg0", "mod0.mpy"), "a") as source:
+            source.write("extra = 1\n")
+        report("one file changed", build(source_dir, output_dir, OPTIONS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# server.py
+"""
+Utilidades compartidas por los benchmarks que levantan la API con uvicorn.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+PORT = 8765
+
+
+@contextmanager
+def running_server(env=None, port=PORT, workers=None, on_start=None, quiet=False):
+    """
+    Levanta main:app con uvicorn (con variables de entorno extra) y lo detiene al salir.
+    workers: cantidad de procesos de uvicorn (por defecto uno solo)
+    on_start: se llama con el Popen del servidor, p. ej. para medir su memoria
+    quiet: descarta la salida estándar del servidor (los errores de compilación)
+    """
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"]
+    if workers:
+        command += ["--workers", str(workers)]
+    process = subprocess.Popen(
+        command, env={**os.environ, **(env or {})}, stdout=subprocess.DEVNULL if quiet else None
+    )
+    if on_start is not None:
+        on_start(process)
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+                break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError("Server did not start")
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def post(url, payload):
+    """POST JSON; devuelve (status, segundos)."""
+    body = json.dumps(payload).encode("utf-8")
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        error.read()
+        status = error.code
+    return status, time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
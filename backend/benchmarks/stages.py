@@ -0,0 +1,154 @@
+# stages.py
+"""
+Tiempo y memoria de cada etapa del compilador (Lexer, Parser.parse,
+Transpiler.transpile, to_tree y str(ast)) sobre programas sintéticos de
+distintas formas.
+
+Uso (desde backend/):
+    python -m benchmarks.stages --save baseline.json
+    python -m benchmarks.stages --baseline baseline.json [--time-threshold 0.15]
+                                [--memory-threshold 0.05] [--save current.json]
+
+Con --baseline compara contra resultados guardados antes y termina con
+código 1 si alguna etapa empeoró más que el umbral (0.15 = 15% más lenta).
+El tiempo es el mejor de --repeat corridas; la memoria es el pico medido
+con tracemalloc en una corrida aparte, y es determinista.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from lexer import Lexer
+from parser import Parser
+from transpiler import Transpiler
+from benchmarks.programs import generate_shaped_program
+
+PROFILES = {
+    "default": {},
+    "large": {"lines": 20000},
+    "deep_nesting": {"nesting": 12},
+    "deep_expressions": {"expression_depth": 8},
+    "many_functions": {"lines": 4000, "functions": 200},
+    "string_heavy": {"string_density": 0.8},
+}
+STAGES = ("lexer", "parser", "transpile", "to_tree", "str")
+
+
+def stage_calls(source):
+    """{etapa: función sin argumentos} para un programa; cada etapa recibe la salida de la anterior."""
+    tokens = Lexer(source)
+    ast = Parser(tokens).parse()
+    return {
+        "lexer": lambda: Lexer(source),
+        "parser": lambda: Parser(tokens).parse(),
+        "transpile": lambda: Transpiler(ast).transpile(),
+        "to_tree": lambda: ast.to_tree(),
+        "str": lambda: str(ast),
+    }
+
+
+def measure(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        # Que una colección pendiente de la corrida anterior no caiga en esta
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def run(profiles, repeat):
+    results = {}
+    for name in profiles:
+        source = generate_shaped_program(**PROFILES[name])
+        calls = stage_calls(source)
+        results[name] = {stage: measure(calls[stage], repeat) for stage in STAGES}
+        results[name]["lines"] = len(source.splitlines())
+    return results
+
+
+def compare(results, baseline, time_threshold, memory_threshold):
+    """Devuelve la lista de regresiones como textos legibles."""
+    regressions = []
+    for profile, stages in results.items():
+        previous = baseline.get(profile)
+        if previous is None:
+            continue
+        for stage in STAGES:
+            if stage not in previous:
+                continue
+            for key, threshold in (("seconds", time_threshold), ("peak_bytes", memory_threshold)):
+                old, new = previous[stage][key], stages[stage][key]
+                if old and new / old > 1 + threshold:
+                    regressions.append(
+                        f"{profile}/{stage}: {key} {old:.6g} -> {new:.6g} (+{new / old - 1:.1%})"
+                    )
+    return regressions
+
+
+def format_row(profile, stage, current, previous):
+    row = (f"  {profile:<17} {stage:<10} {current['seconds'] * 1000:9.2f} ms "
+           f"{current['peak_bytes'] / 1024:10.1f} KiB")
+    if previous is not None:
+        row += (f"  {current['seconds'] / previous['seconds'] - 1:+7.1%}"
+                f"  {current['peak_bytes'] / max(previous['peak_bytes'], 1) - 1:+7.1%}")
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stages")
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES),
+                        help="program shape to run (repeatable, default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage (best is kept)")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--time-threshold", type=float, default=0.15,
+                        help="allowed relative slowdown per stage (default 0.15)")
+    parser.add_argument("--memory-threshold", type=float, default=0.05,
+                        help="allowed relative growth of the memory peak (default 0.05)")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    results = run(args.profile or list(PROFILES), args.repeat)
+    print(f"  {'profile':<17} {'stage':<10} {'time':>12} {'peak':>14}"
+          + ("  {:>7}  {:>7}".format("time", "memory") if baseline else ""))
+    for profile, stages in results.items():
+        for stage in STAGES:
+            previous = baseline.get(profile, {}).get(stage) if baseline else None
+            print(format_row(profile, stage, stages[stage], previous))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "repeat": args.repeat,
+                "profiles": {name: PROFILES[name] for name in results},
+                "results": results,
+            }, file, indent=2, sort_keys=True)
+
+    if baseline is None:
+        return 0
+    regressions = compare(results, baseline, args.time_threshold, args.memory_threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
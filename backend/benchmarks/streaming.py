@@ -0,0 +1,60 @@
+# streaming.py
+"""
+Tiempo hasta el primer byte, hasta el primer registro de JavaScript y total
+de /compile contra /compile/stream (NDJSON) para programas grandes. La caché
+se desactiva para medir la compilación.
+
+Uso (desde backend/):
+    python -m benchmarks.streaming
+"""
+
+import http.client
+import json
+import time
+
+from benchmarks.programs import generate_program
+from benchmarks.server import running_server, PORT
+
+REPEAT = 5
+
+
+def measure(path, source):
+    """Devuelve (primer byte, primer JavaScript, total) en segundos."""
+    connection = http.client.HTTPConnection("127.0.0.1", PORT)
+    body = json.dumps({"code": source})
+    start = time.perf_counter()
+    connection.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    first_byte = first_js = None
+    if path == "/compile/stream":
+        for line in response:
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            record = json.loads(line)
+            if record["type"] == "javascript" and first_js is None:
+                first_js = time.perf_counter() - start
+            assert record["type"] != "error", record
+    else:
+        response.read(1)
+        first_byte = time.perf_counter() - start
+        json.loads(b"{" + response.read())
+        first_js = time.perf_counter() - start
+    total = time.perf_counter() - start
+    connection.close()
+    return first_byte, first_js, total
+
+
+def main():
+    with running_server({"COMPILE_CACHE_ENTRIES": "0"}):
+        for functions in (50, 166):
+            source = generate_program(functions=functions, statements=25)
+            print(f"{len(source.splitlines())} lines of MiniPython")
+            for path in ("/compile", "/compile/stream"):
+                runs = [measure(path, source) for _ in range(REPEAT)]
+                first_byte, first_js, total = (min(values) for values in zip(*runs))
+                print(f"  {path:<16} first byte {first_byte * 1000:8.1f} ms  "
+                      f"first JS {first_js * 1000:8.1f} ms  total {total * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
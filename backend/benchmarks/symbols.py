@@ -0,0 +1,59 @@
+# symbols.py
+"""
+Costo del índice de símbolos: indexar un programa desde cero, volver a
+indexarlo después de editar una función (sólo esa unidad se parsea de nuevo)
+y responder consultas de posición.
+
+Uso (desde backend/):
+    python -m benchmarks.symbols [líneas]
+"""
+
+import sys
+import time
+
+from symbols import SymbolIndexer
+from benchmarks.programs import generate_shaped_program
+
+
+def best(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def edited(source, version):
+    """El programa con una línea nueva al principio de la primera función."""
+    lines = source.split("\n")
+    first = next(number for number, line in enumerate(lines) if line.startswith("def "))
+    lines.insert(first + 1, f"    edit_{version} = {version}")
+    return "\n".join(lines)
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = generate_shaped_program(lines=lines, functions=lines // 50)
+
+    # Cada corrida usa un indexador vacío: nada viene de la caché
+    full = best(lambda: SymbolIndexer().index(source))
+
+    indexer = SymbolIndexer()
+    index, analyzed, _ = indexer.index(source)
+    versions = iter(range(1_000_000))
+    incremental = best(lambda: indexer.index(edited(source, next(versions))))
+    _, edit_analyzed, edit_reused = indexer.index(edited(source, 1_000_000))
+
+    positions = [(line, column) for symbol in index.symbols
+                 for line, column in symbol.definitions + symbol.references]
+    queries = best(lambda: [index.symbol_at(line, column) for line, column in positions])
+
+    print(f"{len(source.splitlines())} lines, {analyzed} units, {len(index.symbols)} symbols")
+    print(f"full index        {full * 1000:8.2f} ms")
+    print(f"after one edit    {incremental * 1000:8.2f} ms  ({edit_analyzed} unit analyzed, {edit_reused} reused)")
+    print(f"symbol_at         {queries / len(positions) * 1e6:8.3f} us per query ({len(positions)} queries)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# transpile_modes.py
+"""
+Compara el tamaño y el tiempo de transpilación del modo normal contra el modo
+compacto (minify) y compacto con nombres locales acortados (mangle).
+
+Uso (desde backend/):
+    python -m benchmarks.transpile_modes
+"""
+
+import time
+
+from lexer import Lexer
+from parser import Parser
+from transpiler import Transpiler
+from benchmarks.programs import generate_program
+
+MODES = [
+    ("pretty", {}),
+    ("minify", {"minify": True}),
+    ("minify+mangle", {"minify": True, "mangle": True}),
+]
+
+
+def best_time(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    for functions in (50, 200, 800):
+        source = generate_program(functions=functions, statements=25)
+        ast = Parser(Lexer(source)).parse()
+        print(f"{functions} functions, {len(source.splitlines())} lines of MiniPython")
+        for name, options in MODES:
+            transpiler = Transpiler(ast, **options)
+            js_code = transpiler.transpile()
+            elapsed = best_time(transpiler.transpile)
+            print(f"  {name:<14} {len(js_code):>10} bytes {elapsed * 1000:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# tree_walker.py
+"""
+Evaluador ingenuo que recorre el AST directamente. Sólo se usa como punto de
+comparación en los benchmarks de los backends de ejecución.
+"""
+
+from ast_nodes import (
+    NumberNode, StringNode, BooleanNode, IdentifierNode,
+    BinOpNode, AssignNode, PrintNode, IfNode, WhileNode, BlockNode,
+    ForNode, FunctionDefNode, FunctionCallNode, ReturnNode, function_locals
+)
+
+OPERATORS = {
+    'PLUS': lambda a, b: a + b,
+    'MINUS': lambda a, b: a - b,
+    'MULT': lambda a, b: a * b,
+    'DIV': lambda a, b: a / b,
+    'GT': lambda a, b: a > b,
+    'LT': lambda a, b: a < b,
+    'EQ': lambda a, b: a == b,
+    'NEQ': lambda a, b: a != b,
+    'GTE': lambda a, b: a >= b,
+    'LTE': lambda a, b: a <= b,
+}
+
+
+class _Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+class _Function:
+    def __init__(self, node, scopes):
+        self.node = node
+        self.scopes = scopes
+        self.local_names = set(function_locals(node))
+
+
+class TreeWalker:
+    def __init__(self):
+        self.globals = {}
+        self.output = []
+
+    def run(self, ast_root):
+        self.execute_body(ast_root.statements, [self.globals])
+        return self.output
+
+    def lookup(self, name, scopes):
+        for scope in reversed(scopes):
+            if name in scope:
+                return scope[name]
+        raise NameError(f"name '{name}' is not defined")
+
+    def execute_body(self, statements, scopes):
+        for stmt in statements:
+            self.execute(stmt, scopes)
+
+    def execute(self, node, scopes):
+        if isinstance(node, AssignNode):
+            scopes[-1][node.target.name] = self.evaluate(node.value, scopes)
+        elif isinstance(node, PrintNode):
+            self.output.append(str(self.evaluate(node.value, scopes)))
+        elif isinstance(node, IfNode):
+            if self.evaluate(node.condition, scopes):
+                self.execute_body(node.body, scopes)
+            elif node.else_body is not None:
+                self.execute_body(node.else_body, scopes)
+        elif isinstance(node, WhileNode):
+            while self.evaluate(node.condition, scopes):
+                self.execute_body(node.body, scopes)
+        elif isinstance(node, ForNode):
+            start = self.evaluate(node.iterable.start, scopes)
+            stop = self.evaluate(node.iterable.stop, scopes)
+            step = self.evaluate(node.iterable.step, scopes)
+            for value in range(start, stop, step):
+                scopes[-1][node.variable.name] = value
+                self.execute_body(node.body, scopes)
+        elif isinstance(node, FunctionDefNode):
+            scopes[-1][node.name] = _Function(node, scopes)
+        elif isinstance(node, ReturnNode):
+            value = self.evaluate(node.value, scopes) if node.value is not None else None
+            raise _Return(value)
+        elif isinstance(node, BlockNode):
+            self.execute_body(node.statements, scopes)
+        else:
+            self.evaluate(node, scopes)
+
+    def evaluate(self, node, scopes):
+        if isinstance(node, (NumberNode, StringNode)):
+            return node.value
+        if isinstance(node, BooleanNode):
+            return node.value in (True, "True")
+        if isinstance(node, IdentifierNode):
+            return self.lookup(node.name, scopes)
+        if isinstance(node, BinOpNode):
+            left = self.evaluate(node.left, scopes)
+            right = self.evaluate(node.right, scopes)
+            return OPERATORS[node.op](left, right)
+        if isinstance(node, FunctionCallNode):
+            func = self.lookup(node.name, scopes)
+            args = [self.evaluate(arg, scopes) for arg in node.args]
+            local_scope = {param.name: arg for param, arg in zip(func.node.params, args)}
+            # Las globales viven en scopes[0]; las exteriores son de sólo lectura
+            try:
+                self.execute_body(func.node.body, func.scopes + [local_scope])
+            except _Return as ret:
+                return ret.value
+            return None
+        raise NotImplementedError(f"Cannot evaluate {node.__class__.__name__}")
@@ -0,0 +1,74 @@
+# wire_size.py
+"""
+Bytes transferidos y latencia de punta a punta de /compile para un programa
+de ~10k líneas, según la codificación de los tokens (repr / columnar) y la
+compresión negociada (ninguna, gzip, brotli). La latencia incluye
+descomprimir y decodificar el JSON en el cliente. La caché se desactiva.
+
+Uso (desde backend/):
+    python -m benchmarks.wire_size
+"""
+
+import gzip
+import json
+import time
+import urllib.request
+
+from benchmarks.programs import generate_program
+from benchmarks.server import running_server
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+REPEAT = 5
+
+CASES = [
+    ("repr", None),
+    ("repr", "gzip"),
+    ("repr", "br"),
+    ("columnar", None),
+    ("columnar", "gzip"),
+    ("columnar", "br"),
+]
+
+
+def fetch(url, payload, encoding):
+    headers = {"Content-Type": "application/json"}
+    if encoding:
+        headers["Accept-Encoding"] = encoding
+    request = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"), headers=headers)
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        body = response.read()
+        received = response.headers.get("Content-Encoding")
+    if received == "gzip":
+        data = gzip.decompress(body)
+    elif received == "br":
+        data = brotli.decompress(body)
+    else:
+        data = body
+    json.loads(data)
+    return len(body), received, time.perf_counter() - start
+
+
+def main():
+    source = generate_program(functions=166, statements=25)
+    print(f"{len(source.splitlines())} lines of MiniPython")
+    with running_server({"COMPILE_CACHE_ENTRIES": "0"}) as url:
+        for artifacts in (["tokens"], ["tokens", "output", "ast", "javascript"]):
+            print(f"artifacts: {', '.join(artifacts)}")
+            for token_format, encoding in CASES:
+                if encoding == "br" and brotli is None:
+                    print(f"  {token_format:<9} br       skipped (brotli not installed)")
+                    continue
+                payload = {"code": source, "token_format": token_format, "artifacts": artifacts}
+                runs = [fetch(f"{url}/compile", payload, encoding) for _ in range(REPEAT)]
+                size, received = runs[0][0], runs[0][1] or "identity"
+                best = min(seconds for _, _, seconds in runs)
+                print(f"  {token_format:<9} {received:<8} {size / 1024:10.1f} KiB  {best * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# budgets.py
+
+from copy import copy
+from time import perf_counter
+
+# Cada cuántas unidades de trabajo (líneas, nodos) se mira el reloj
+DEADLINE_CHECK_INTERVAL = 1024
+
+
+class CompileLimitExceeded(Exception):
+    """
+    El programa superó uno de los límites de CompileBudget.
+
+    limit: nombre del límite ("source_bytes", "tokens", "nodes", "depth",
+           "output_size" o "deadline")
+    status_code: 413 si la entrada es demasiado grande, 422 si su estructura
+           o el trabajo que requiere exceden lo permitido
+    """
+    def __init__(self, message, limit, status_code=422):
+        # Todos los datos van en args para que la excepción se pueda
+        # serializar al volver de un proceso del pool
+        super().__init__(message, limit, status_code)
+        self.limit = limit
+        self.status_code = status_code
+
+    def __str__(self):
+        return self.args[0]
+
+
+class CompileBudget:
+    """
+    Límites de recursos de una compilación. El lexer, el parser y los
+    emisores los comprueban sobre la marcha para cortar cuanto antes las
+    entradas patológicas. Un límite en None no se comprueba.
+
+    max_source_bytes: tamaño del código fuente (UTF-8)
+    max_tokens: cantidad de tokens
+    max_nodes: cantidad de nodos del AST
+    max_depth: anidamiento de bloques y paréntesis
+    max_tree_depth: profundidad del AST (los emisores son recursivos)
+    max_output_size: tamaño de cada artefacto generado, en caracteres
+    deadline_seconds: tiempo total de la compilación, medido desde start()
+    """
+    def __init__(self, max_source_bytes=None, max_tokens=None, max_nodes=None,
+                 max_depth=None, max_output_size=None, deadline_seconds=None,
+                 max_tree_depth=None):
+        self.max_source_bytes = max_source_bytes
+        self.max_tokens = max_tokens
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.max_tree_depth = max_tree_depth
+        self.max_output_size = max_output_size
+        self.deadline_seconds = deadline_seconds
+        self.deadline = None
+
+    def start(self):
+        """
+        Devuelve una copia con el reloj en marcha, así el mismo presupuesto
+        sirve de plantilla para todas las compilaciones.
+        """
+        started = copy(self)
+        if self.deadline_seconds is not None:
+            started.deadline = perf_counter() + self.deadline_seconds
+        return started
+
+    def check_deadline(self):
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise CompileLimitExceeded(
+                f"Compilation exceeded the {self.deadline_seconds} second time limit", "deadline"
+            )
+
+    def check_source(self, code):
+        if self.max_source_bytes is None:
+            return
+        # Cota rápida: cada carácter ocupa entre 1 y 4 bytes en UTF-8
+        if len(code) * 4 <= self.max_source_bytes:
+            return
+        size = len(code) if code.isascii() else len(code.encode("utf-8"))
+        if size > self.max_source_bytes:
+            raise CompileLimitExceeded(
+                f"Program is {size} bytes, the limit is {self.max_source_bytes}", "source_bytes", 413
+            )
+
+    def check_tokens(self, count, line):
+        if self.max_tokens is not None and count > self.max_tokens:
+            raise CompileLimitExceeded(
+                f"Program exceeds the limit of {self.max_tokens} tokens at line {line}", "tokens", 413
+            )
+
+    def check_nesting(self, depth, line):
+        if self.max_depth is not None and depth > self.max_depth:
+            raise CompileLimitExceeded(
+                f"Nesting deeper than {self.max_depth} levels at line {line}", "depth"
+            )
+
+    def check_nodes(self, count):
+        """El parser la llama cada DEADLINE_CHECK_INTERVAL nodos creados."""
+        if self.max_nodes is not None and count > self.max_nodes:
+            raise CompileLimitExceeded(
+                f"Program exceeds the limit of {self.max_nodes} syntax tree nodes", "nodes"
+            )
+        self.check_deadline()
+
+    def check_tree(self, root):
+        """
+        Comprueba la profundidad del AST antes de pasarlo a los emisores
+        recursivos. Una cadena larga como 1 + 1 + ... + 1 no anida paréntesis
+        pero produce un árbol tan profundo como términos tenga.
+        """
+        if self.max_tree_depth is None:
+            return
+        # Recorrido por niveles: cada vuelta baja un nivel del árbol
+        level = root.children()
+        depth = 0
+        while level:
+            depth += 1
+            if depth > self.max_tree_depth:
+                raise CompileLimitExceeded(
+                    f"Syntax tree deeper than {self.max_tree_depth} levels", "depth"
+                )
+            self.check_deadline()
+            level = [child for node in level for child in node.children()]
+
+    def check_output(self, text):
+        self.check_output_size(len(text))
+
+    def check_output_size(self, size):
+        if self.max_output_size is not None and size > self.max_output_size:
+            raise CompileLimitExceeded(
+                f"Generated output exceeds the limit of {self.max_output_size} characters", "output_size"
+            )
@@ -0,0 +1,317 @@
+# bytecode.py
+
+from ast_nodes import (
+    NumberNode, StringNode, BooleanNode, IdentifierNode,
+    BinOpNode, AssignNode, PrintNode, IfNode, WhileNode, BlockNode,
+    ForNode, RangeNode, FunctionDefNode, FunctionCallNode, ReturnNode,
+    function_locals
+)
+
+# Opcodes. Cada instrucción ocupa dos enteros en el arreglo: (opcode, argumento)
+LOAD_CONST = 0
+LOAD_GLOBAL = 1
+STORE_GLOBAL = 2
+LOAD_FAST = 3
+STORE_FAST = 4
+LOAD_FREE = 5
+BINARY_ADD = 6
+BINARY_SUB = 7
+BINARY_MUL = 8
+BINARY_DIV = 9
+COMPARE_GT = 10
+COMPARE_LT = 11
+COMPARE_EQ = 12
+COMPARE_NEQ = 13
+COMPARE_GTE = 14
+COMPARE_LTE = 15
+JUMP = 16
+POP_JUMP_IF_FALSE = 17
+GET_RANGE_ITER = 18
+FOR_ITER = 19
+PRINT = 20
+POP_TOP = 21
+MAKE_FUNCTION = 22
+CALL = 23
+RETURN_VALUE = 24
+
+OPNAMES = {
+    value: name for name, value in list(globals().items())
+    if name.isupper() and isinstance(value, int)
+}
+
+BINARY_OPCODES = {
+    'PLUS': BINARY_ADD,
+    'MINUS': BINARY_SUB,
+    'MULT': BINARY_MUL,
+    'DIV': BINARY_DIV,
+    'GT': COMPARE_GT,
+    'LT': COMPARE_LT,
+    'EQ': COMPARE_EQ,
+    'NEQ': COMPARE_NEQ,
+    'GTE': COMPARE_GTE,
+    'LTE': COMPARE_LTE,
+}
+
+# Opcodes cuyo argumento es una dirección de salto
+JUMP_OPCODES = {JUMP, POP_JUMP_IF_FALSE, FOR_ITER}
+
+
+class CodeObject:
+    """
+    Resultado de compilar un programa o una función.
+
+    code: arreglo plano de enteros (opcode, argumento, opcode, argumento, ...)
+    consts: tabla de constantes (números, strings, booleanos, funciones)
+    names: tabla de nombres globales
+    varnames: nombres de los slots locales (los parámetros van primero)
+    freevars: variables de funciones exteriores como (profundidad, slot, nombre)
+    """
+    __slots__ = ("name", "code", "consts", "names", "varnames", "argcount", "freevars")
+
+    def __init__(self, name, code, consts, names, varnames, argcount, freevars):
+        self.name = name
+        self.code = code
+        self.consts = consts
+        self.names = names
+        self.varnames = varnames
+        self.argcount = argcount
+        self.freevars = freevars
+
+    def __repr__(self):
+        return f"<code {self.name}, {len(self.code) // 2} instructions>"
+
+    def disassemble(self):
+        """Devuelve una representación legible de las instrucciones."""
+        lines = [f"{self.name}:"]
+        for pc in range(0, len(self.code), 2):
+            op, arg = self.code[pc], self.code[pc + 1]
+            if op == LOAD_CONST:
+                detail = repr(self.consts[arg])
+            elif op in (LOAD_GLOBAL, STORE_GLOBAL):
+                detail = self.names[arg]
+            elif op in (LOAD_FAST, STORE_FAST):
+                detail = self.varnames[arg]
+            elif op == LOAD_FREE:
+                detail = "%s (depth %d, slot %d)" % (self.freevars[arg][2], *self.freevars[arg][:2])
+            elif op in JUMP_OPCODES:
+                detail = f"to {arg}"
+            else:
+                detail = ""
+            lines.append(f"  {pc:>5} {OPNAMES[op]:<18} {arg:<5} {detail}".rstrip())
+        for const in self.consts:
+            if isinstance(const, CodeObject):
+                lines.append(const.disassemble())
+        return "\n".join(lines)
+
+
+class Compiler:
+    """
+    Compila el AST de MiniPython a bytecode para la VM de vm.py.
+
+    El código del módulo usa variables globales. Dentro de una función, los
+    parámetros y las variables asignadas son locales (igual que en Python) y
+    viven en slots numerados; las variables locales de funciones exteriores
+    se leen como variables libres.
+    """
+    def __init__(self, name="<module>", local_names=None, argcount=0, parent=None):
+        self.name = name
+        self.parent = parent
+        self.argcount = argcount
+        self.is_function = local_names is not None
+        self.varnames = list(local_names or [])
+        self.slots = {name: slot for slot, name in enumerate(self.varnames)}
+        self.code = []
+        self.consts = []
+        self.const_index = {}
+        self.names = []
+        self.name_index = {}
+        self.freevars = []
+        self.free_index = {}
+
+        self.statement_compilers = {
+            AssignNode: self.compile_assign,
+            PrintNode: self.compile_print,
+            IfNode: self.compile_if,
+            WhileNode: self.compile_while,
+            ForNode: self.compile_for,
+            FunctionDefNode: self.compile_function_def,
+            ReturnNode: self.compile_return,
+            BlockNode: self.compile_block,
+        }
+
+    def compile(self, node):
+        if isinstance(node, BlockNode):
+            self.compile_block(node)
+        else:
+            self.compile_body(node)
+        self.emit(LOAD_CONST, self.add_const(None))
+        self.emit(RETURN_VALUE)
+        return CodeObject(
+            self.name, self.code, self.consts, self.names,
+            self.varnames, self.argcount, self.freevars
+        )
+
+    # Tablas ---------------------------------------------------------------
+
+    def emit(self, op, arg=0):
+        self.code.append(op)
+        self.code.append(arg)
+        return len(self.code) - 2
+
+    def patch(self, pc, target):
+        self.code[pc + 1] = target
+
+    def add_const(self, value):
+        # La clave incluye el tipo para no confundir True con 1
+        key = (type(value), value) if not isinstance(value, CodeObject) else id(value)
+        if key not in self.const_index:
+            self.const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return self.const_index[key]
+
+    def add_name(self, name):
+        if name not in self.name_index:
+            self.name_index[name] = len(self.names)
+            self.names.append(name)
+        return self.name_index[name]
+
+    def resolve_free(self, name):
+        """Busca name en las funciones exteriores; devuelve (profundidad, slot)."""
+        depth = 1
+        scope = self.parent
+        while scope is not None and scope.is_function:
+            if name in scope.slots:
+                return depth, scope.slots[name]
+            depth += 1
+            scope = scope.parent
+        return None
+
+    def emit_load(self, name):
+        if name in self.slots:
+            self.emit(LOAD_FAST, self.slots[name])
+            return
+        free = self.resolve_free(name) if self.is_function else None
+        if free is not None:
+            if free not in self.free_index:
+                self.free_index[free] = len(self.freevars)
+                self.freevars.append(free + (name,))
+            self.emit(LOAD_FREE, self.free_index[free])
+        else:
+            self.emit(LOAD_GLOBAL, self.add_name(name))
+
+    def emit_store(self, name):
+        if name in self.slots:
+            self.emit(STORE_FAST, self.slots[name])
+        else:
+            self.emit(STORE_GLOBAL, self.add_name(name))
+
+    # Sentencias -----------------------------------------------------------
+
+    def compile_body(self, statements):
+        for stmt in statements:
+            self.compile_statement(stmt)
+
+    def compile_block(self, node):
+        self.compile_body(node.statements)
+
+    def compile_statement(self, node):
+        compiler = self.statement_compilers.get(type(node))
+        if compiler is not None:
+            compiler(node)
+        else:
+            # Expresión usada como sentencia (p.ej. una llamada suelta)
+            self.compile_expression(node)
+            self.emit(POP_TOP)
+
+    def compile_assign(self, node):
+        if not isinstance(node.target, IdentifierNode):
+            raise SyntaxError(f"Cannot assign to {node.target}")
+        self.compile_expression(node.value)
+        self.emit_store(node.target.name)
+
+    def compile_print(self, node):
+        self.compile_expression(node.value)
+        self.emit(PRINT)
+
+    def compile_if(self, node):
+        self.compile_expression(node.condition)
+        jump_else = self.emit(POP_JUMP_IF_FALSE)
+        self.compile_body(node.body)
+        if node.else_body is not None:
+            jump_end = self.emit(JUMP)
+            self.patch(jump_else, len(self.code))
+            self.compile_body(node.else_body)
+            self.patch(jump_end, len(self.code))
+        else:
+            self.patch(jump_else, len(self.code))
+
+    def compile_while(self, node):
+        top = len(self.code)
+        self.compile_expression(node.condition)
+        jump_end = self.emit(POP_JUMP_IF_FALSE)
+        self.compile_body(node.body)
+        self.emit(JUMP, top)
+        self.patch(jump_end, len(self.code))
+
+    def compile_for(self, node):
+        if not isinstance(node.iterable, RangeNode):
+            raise NotImplementedError("Only range() is supported in for loops")
+        self.compile_expression(node.iterable.start)
+        self.compile_expression(node.iterable.stop)
+        self.compile_expression(node.iterable.step)
+        self.emit(GET_RANGE_ITER)
+        top = self.emit(FOR_ITER)
+        self.emit_store(node.variable.name)
+        self.compile_body(node.body)
+        self.emit(JUMP, top)
+        self.patch(top, len(self.code))
+
+    def compile_function_def(self, node):
+        params = [param.name for param in node.params]
+        compiler = Compiler(node.name, function_locals(node), len(params), parent=self)
+        code = compiler.compile(node.body)
+        self.emit(LOAD_CONST, self.add_const(code))
+        self.emit(MAKE_FUNCTION)
+        self.emit_store(node.name)
+
+    def compile_return(self, node):
+        if not self.is_function:
+            raise SyntaxError("'return' outside function")
+        if node.value is not None:
+            self.compile_expression(node.value)
+        else:
+            self.emit(LOAD_CONST, self.add_const(None))
+        self.emit(RETURN_VALUE)
+
+    # Expresiones ----------------------------------------------------------
+
+    def compile_expression(self, node):
+        if isinstance(node, NumberNode):
+            self.emit(LOAD_CONST, self.add_const(node.value))
+        elif isinstance(node, StringNode):
+            self.emit(LOAD_CONST, self.add_const(node.value))
+        elif isinstance(node, BooleanNode):
+            self.emit(LOAD_CONST, self.add_const(node.value in (True, "True")))
+        elif isinstance(node, IdentifierNode):
+            self.emit_load(node.name)
+        elif isinstance(node, BinOpNode):
+            self.compile_expression(node.left)
+            self.compile_expression(node.right)
+            if node.op not in BINARY_OPCODES:
+                raise NotImplementedError(f"Unsupported operator {node.op}")
+            self.emit(BINARY_OPCODES[node.op])
+        elif isinstance(node, FunctionCallNode):
+            name = node.name if isinstance(node.name, str) else node.name.name
+            self.emit_load(name)
+            for arg in node.args:
+                self.compile_expression(arg)
+            self.emit(CALL, len(node.args))
+        else:
+            raise NotImplementedError(f"Cannot compile {node.__class__.__name__}")
+
+
+def compile_program(ast_root):
+    """
+    Función de conveniencia: compila el BlockNode raíz a un CodeObject.
+    """
+    return Compiler().compile(ast_root)
@@ -0,0 +1,240 @@
+# compiler_cli.py
+"""
+Compilador de proyectos MiniPython por línea de comandos.
+
+Recorre un directorio buscando archivos .mpy y escribe el JavaScript de
+cada uno en el directorio de salida, con la misma estructura:
+
+    python -m compiler_cli src/ build/ [--jobs N] [--minify] [--mangle]
+                                       [--optimize-loops] [--force]
+
+Los archivos se compilan en paralelo en un pool de procesos. Un manifiesto
+(build/.mpy-manifest.json) guarda el hash del contenido de cada fuente, así
+que sólo se recompilan los archivos que cambiaron; si el tamaño y la fecha
+de modificación no cambiaron (y la salida sigue ahí) ni siquiera se vuelve a
+leer el archivo. Las
+salidas y el manifiesto se escriben de forma atómica (archivo temporal más
+os.replace), así que un build interrumpido nunca deja JavaScript a medias.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import Lexer
+from parser import Parser
+from transpiler import Transpiler
+from pipeline import format_error_message
+
+SOURCE_SUFFIX = ".mpy"
+OUTPUT_SUFFIX = ".js"
+MANIFEST_NAME = ".mpy-manifest.json"
+MANIFEST_VERSION = 1
+
+# Con menos archivos que esto no vale la pena levantar el pool
+MIN_PARALLEL_FILES = 32
+
+
+def write_atomic(path, text):
+    """Escribe text en path reemplazando el archivo de una sola vez."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Cada archivo lo escribe un solo proceso, así que el pid alcanza para
+    # que el nombre temporal sea único (y es más barato que tempfile)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as temp:
+            temp.write(text)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def remove_output(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def compile_file(job):
+    """
+    Compila un archivo en un proceso del pool.
+    job: (ruta relativa, ruta de la fuente, ruta de salida, opciones, hash conocido)
+    Devuelve (ruta relativa, hash, si se compiló, error o None). Si el hash
+    coincide con el conocido (sólo cambió la fecha del archivo) y la salida
+    existe, no se vuelve a compilar. Si falla se borra la salida anterior:
+    el archivo queda fuera del manifiesto y nadie más la limpiaría.
+    """
+    relative, source_path, output_path, options, known_digest = job
+    with open(source_path, "rb") as source:
+        data = source.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == known_digest and os.path.exists(output_path):
+        return relative, digest, False, None
+    try:
+        code = data.decode("utf-8")
+        ast = Parser(Lexer(code)).parse()
+        javascript = Transpiler(ast, **options).transpile()
+    except UnicodeDecodeError as e:
+        remove_output(output_path)
+        return relative, digest, False, f"Error:\n\n{e}"
+    except Exception as e:
+        remove_output(output_path)
+        return relative, digest, False, format_error_message(e, code)
+    write_atomic(output_path, javascript + "\n")
+    return relative, digest, True, None
+
+
+def scan_sources(source_dir):
+    """Devuelve {ruta relativa: (tamaño, mtime_ns)} de todos los .mpy del árbol."""
+    found = {}
+    pending = [(source_dir, "")]
+    while pending:
+        directory, prefix = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.endswith(SOURCE_SUFFIX) and entry.is_file():
+                    stat = entry.stat()
+                    found[prefix + name] = (stat.st_size, stat.st_mtime_ns)
+                elif not name.startswith(".") and entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, prefix + name + os.sep))
+    return found
+
+
+def load_manifest(path, options):
+    """Entradas del manifiesto anterior, o {} si no existe o se compiló con otras opciones."""
+    try:
+        with open(path, encoding="utf-8") as manifest:
+            data = json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION or data.get("options") != options:
+        return {}
+    return data.get("files", {})
+
+
+def output_path_for(output_dir, relative):
+    return os.path.join(output_dir, relative[:-len(SOURCE_SUFFIX)] + OUTPUT_SUFFIX)
+
+
+def build(source_dir, output_dir, options, jobs=None, force=False):
+    """
+    Compila el árbol y devuelve un resumen con contadores, errores y tiempos
+    de cada fase.
+    """
+    timings = {}
+    start = time.perf_counter()
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    previous = load_manifest(manifest_path, options)
+    sources = scan_sources(source_dir)
+    timings["scan"] = time.perf_counter() - start
+
+    files = {}
+    work = []
+    for relative, (size, mtime_ns) in sources.items():
+        entry = None if force else previous.get(relative)
+        output_path = output_path_for(output_dir, relative)
+        if (entry is not None and entry["size"] == size and entry["mtime_ns"] == mtime_ns
+                and os.path.exists(output_path)):
+            files[relative] = entry
+            continue
+        work.append((
+            relative,
+            os.path.join(source_dir, relative),
+            output_path,
+            options,
+            entry["sha256"] if entry is not None else None,
+        ))
+
+    phase = time.perf_counter()
+    if len(work) < MIN_PARALLEL_FILES or jobs == 1:
+        results = [compile_file(job) for job in work]
+    else:
+        workers = jobs or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(work) // (workers * 8))
+            results = list(pool.map(compile_file, work, chunksize=chunksize))
+    timings["compile"] = time.perf_counter() - phase
+
+    errors = {}
+    compiled = 0
+    for relative, digest, was_compiled, error in results:
+        if error is not None:
+            # Sin entrada en el manifiesto: se vuelve a intentar en el próximo build
+            errors[relative] = error
+            continue
+        size, mtime_ns = sources[relative]
+        files[relative] = {"size": size, "mtime_ns": mtime_ns, "sha256": digest}
+        compiled += was_compiled
+
+    # Salidas de fuentes que ya no existen
+    phase = time.perf_counter()
+    removed = 0
+    for relative in previous.keys() - sources.keys():
+        try:
+            os.unlink(output_path_for(output_dir, relative))
+            removed += 1
+        except FileNotFoundError:
+            pass
+    if work or removed or previous.keys() != files.keys():
+        write_atomic(manifest_path, json.dumps(
+            {"version": MANIFEST_VERSION, "options": options, "files": files}, sort_keys=True
+        ))
+    timings["manifest"] = time.perf_counter() - phase
+    timings["total"] = time.perf_counter() - start
+
+    return {
+        "sources": len(sources),
+        "compiled": compiled,
+        "up_to_date": len(sources) - compiled - len(errors),
+        "failed": len(errors),
+        "removed": removed,
+        "errors": errors,
+        "timings": timings,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m compiler_cli",
+        description="Compile a tree of MiniPython (.mpy) files to JavaScript."
+    )
+    parser.add_argument("source", help="directory with the .mpy sources")
+    parser.add_argument("output", help="directory for the generated .js files")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--minify", action="store_true", help="emit compact JavaScript")
+    parser.add_argument("--mangle", action="store_true", help="shorten local identifiers")
+    parser.add_argument("--optimize-loops", action="store_true",
+                        help="closed-form rewrite of accumulating for loops")
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and rebuild everything")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.source):
+        parser.error(f"{args.source} is not a directory")
+    options = {"minify": args.minify, "mangle": args.mangle, "optimize_loops": args.optimize_loops}
+    summary = build(args.source, args.output, options, jobs=args.jobs, force=args.force)
+
+    for relative, error in sorted(summary["errors"].items()):
+        print(f"{relative}: {error}\n", file=sys.stderr)
+    timings = summary["timings"]
+    print(
+        f"{summary['sources']} files: {summary['compiled']} compiled, "
+        f"{summary['up_to_date']} up to date, {summary['failed']} failed, {summary['removed']} removed"
+    )
+    print(
+        f"scan {timings['scan'] * 1000:.1f} ms, compile {timings['compile'] * 1000:.1f} ms, "
+        f"manifest {timings['manifest'] * 1000:.1f} ms, total {timings['total'] * 1000:.1f} ms"
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
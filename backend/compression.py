@@ -0,0 +1,132 @@
+# compression.py
+
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él sólo se ofrece gzip
+    brotli = None
+
+
+def choose_encoding(accept_encoding):
+    """
+    Elige la codificación según el header Accept-Encoding: br si el cliente
+    la acepta y el módulo brotli está instalado, si no gzip, si no None.
+    """
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _GzipEncoder:
+    def __init__(self, level):
+        # wbits=31: formato gzip (encabezado y CRC), no zlib crudo
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def encode(self, data, final):
+        flush = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self.compressor.compress(data) + self.compressor.flush(flush)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def encode(self, data, final):
+        out = self.compressor.process(data)
+        return out + (self.compressor.finish() if final else self.compressor.flush())
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI que comprime las respuestas HTTP con gzip o brotli,
+    negociado con Accept-Encoding.
+
+    minimum_size: las respuestas completas más chicas se envían sin comprimir
+    gzip_level / brotli_quality: nivel de compresión de cada algoritmo
+
+    Las respuestas en streaming (NDJSON) se comprimen siempre, vaciando el
+    compresor en cada fragmento para que el cliente reciba cada línea en
+    cuanto se genera.
+    """
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                # Se retiene hasta saber si el cuerpo se comprime
+                start_message = message
+                passthrough = any(name == b"content-encoding" for name, _ in message["headers"])
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                if start_message is not None:
+                    await send(start_message)
+                    start_message = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+                vary = [value for name, value in start_message["headers"] if name == b"vary"]
+                headers = [
+                    (name, value) for name, value in start_message["headers"]
+                    if name not in (b"content-length", b"vary")
+                ]
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+                headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+                if encoding == "br":
+                    encoder = _BrotliEncoder(self.brotli_quality)
+                else:
+                    encoder = _GzipEncoder(self.gzip_level)
+                data = encoder.encode(body, final=not more_body)
+                if not more_body:
+                    headers.append((b"content-length", str(len(data)).encode("latin-1")))
+                await send({**start_message, "headers": headers})
+                start_message = None
+            else:
+                data = encoder.encode(body, final=not more_body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,5 +1,7 @@
 import re
 
+from budgets import DEADLINE_CHECK_INTERVAL
+
 # List of keywords and symbols
 KEYWORDS = {
     'if': 'IF', 
@@ -32,10 +34,18 @@ SYMBOLS = {
     ',': 'COMMA'
 }
 
-def Lexer(code):
+def Lexer(code, budget=None):
+    """
+    Tokenizes code into (type, value, line) tuples. If a CompileBudget is
+    given, source size, token count, nesting and the deadline are checked
+    as the lexer goes.
+    """
+    if budget is not None:
+        budget.check_source(code)
     tokens = []
     lines = code.split('\n')
     indent_stack = [0]
+    paren_depth = 0
 
     
     for line_num, line in enumerate(lines, start=1):
@@ -61,6 +71,8 @@ def Lexer(code):
         if indent > indent_stack[-1]:
             tokens.append(('INDENT', '', line_num))
             indent_stack.append(indent)
+            if budget is not None:
+                budget.check_nesting(len(indent_stack) - 1 + paren_depth, line_num)
 
         # Process the rest of the line
         line = line.strip()
@@ -120,11 +132,23 @@ def Lexer(code):
             if c in SYMBOLS:
                 tokens.append((SYMBOLS[c], c, line_num))
                 i += 1
+                # The parser recurses once per open parenthesis
+                if c == '(':
+                    paren_depth += 1
+                    if budget is not None:
+                        budget.check_nesting(len(indent_stack) - 1 + paren_depth, line_num)
+                elif c == ')':
+                    paren_depth -= 1
                 continue
 
             # Unrecognized character
             tokens.append(('ERROR', c, line_num))
             i += 1
+
+        if budget is not None:
+            budget.check_tokens(len(tokens), line_num)
+            if line_num % DEADLINE_CHECK_INTERVAL == 0:
+                budget.check_deadline()
     
     # Add EOF token at the end
     tokens.append(('EOF', '', len(lines)))
@@ -0,0 +1,111 @@
+# live_sessions.py
+
+from lexer import Lexer
+from result_cache import payload_size
+
+# Memoria aproximada de un token (la tupla, su entrada en la lista, el tipo y
+# la línea) sin contar el texto del valor
+TOKEN_BYTES = 96
+
+
+def _tokens_size(tokens):
+    if tokens is None:
+        return 0
+    return sum(TOKEN_BYTES + len(value) for _, value, _ in tokens)
+
+
+class SessionError(ValueError):
+    """Mensaje inválido de un cliente de una sesión en vivo."""
+
+
+class LiveSession:
+    """
+    Estado del lado del servidor de una sesión de compilación en vivo.
+
+    Guarda el último código fuente, sus tokens y la última respuesta, para no
+    recompilar cuando una ráfaga de cambios deja el programa igual (o sólo
+    cambia espacios o comentarios, que no alteran los tokens). Un "open" con
+    otras opciones descarta la respuesta guardada.
+
+    Si lo guardado supera max_bytes se descartan primero los tokens y después
+    la respuesta: la sesión sigue funcionando, pero recompila cada cambio.
+    """
+    def __init__(self, max_source_bytes, max_bytes=None):
+        self.max_source_bytes = max_source_bytes
+        self.max_bytes = max_bytes
+        self.options = {}
+        self.source = ""
+        self.version = 0
+        self.last_source = None
+        self.last_tokens = None
+        self.last_result = None  # (is_error, payload)
+        self.pending_tokens = None
+
+    def apply(self, message):
+        """
+        Aplica un mensaje del cliente:
+            {"type": "open", "code": "...", "minify": true, ...}
+            {"type": "replace", "code": "..."}
+            {"type": "edit", "start": 10, "end": 12, "text": "..."}
+        """
+        if not isinstance(message, dict):
+            raise SessionError("Messages must be JSON objects")
+        kind = message.get("type")
+
+        if kind == "open":
+            options = {key: value for key, value in message.items() if key not in ("type", "code")}
+            if options != self.options:
+                # La última respuesta se compiló con las opciones anteriores
+                self.options = options
+                self.last_source = self.last_tokens = self.last_result = None
+            source = message.get("code", "")
+        elif kind == "replace":
+            source = message.get("code", "")
+        elif kind == "edit":
+            start, end, text = message.get("start"), message.get("end"), message.get("text", "")
+            if not isinstance(start, int) or not isinstance(end, int) or not 0 <= start <= end <= len(self.source):
+                raise SessionError(f"Invalid edit range {start}..{end} for a source of {len(self.source)} characters")
+            source = self.source[:start] + str(text) + self.source[end:]
+        else:
+            raise SessionError(f"Unknown message type {kind!r}")
+
+        if not isinstance(source, str):
+            raise SessionError("code must be a string")
+        if len(source.encode("utf-8")) > self.max_source_bytes:
+            raise SessionError(f"Source exceeds the {self.max_source_bytes} byte session limit")
+        self.source = source
+        self.version += 1
+
+    def cached_result(self):
+        """
+        Devuelve el resultado anterior si sigue siendo válido para el código
+        actual, o None si hace falta compilar. Lexear es mucho más barato que
+        el resto del pipeline, así que se usa para detectar cambios sin efecto,
+        pero aun así conviene llamarla fuera del event loop.
+        """
+        if self.source == self.last_source:
+            return self.last_result
+        tokens = Lexer(self.source)
+        if tokens == self.last_tokens and self.last_result is not None:
+            self.last_source = self.source
+            return self.last_result
+        self.pending_tokens = tokens
+        return None
+
+    def store_result(self, is_error, payload):
+        self.last_source = self.source
+        self.last_tokens = self.pending_tokens
+        self.last_result = (is_error, payload)
+        self.pending_tokens = None
+        if self.max_bytes is not None and self.memory_bytes() > self.max_bytes:
+            self.last_tokens = None
+            if self.memory_bytes() > self.max_bytes:
+                self.last_source = self.last_result = None
+
+    def memory_bytes(self):
+        """Tamaño aproximado del estado guardado por la sesión."""
+        size = len(self.source) + len(self.last_source or "")
+        size += _tokens_size(self.last_tokens) + _tokens_size(self.pending_tokens)
+        if self.last_result is not None:
+            size += payload_size(self.last_result[1])
+        return size
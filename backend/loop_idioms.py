@@ -0,0 +1,295 @@
+# loop_idioms.py
+"""
+Reconocimiento de idiomas en bucles for sobre range().
+
+Detecta bucles cuyo cuerpo sólo acumula valores, por ejemplo:
+
+    for i in range(n):
+        total = total + i           # suma lineal en i
+        count = count + 1           # conteo
+        if i > limit:
+            matches = matches + 1   # conteo de coincidencias
+        power = power * 2           # producto por una constante
+
+y los reemplaza por su forma cerrada, de costo constante. La forma cerrada
+sólo se usa si en tiempo de ejecución todos los valores involucrados son
+enteros seguros de JavaScript (y también lo son los resultados y las sumas
+parciales); en cualquier otro caso se ejecuta el bucle original, así que el
+resultado es siempre idéntico. Como el for emitido declara su variable con
+`let`, el bucle no deja ningún estado propio fuera de él y la forma cerrada
+tampoco.
+"""
+
+from ast_nodes import (
+    NumberNode, IdentifierNode, BinOpNode, AssignNode, IfNode, RangeNode
+)
+
+# Operadores aritméticos que preservan valores enteros
+INTEGER_OPERATORS = ('PLUS', 'MINUS', 'MULT')
+
+# Comparación con la variable del bucle del lado derecho -> lado izquierdo
+FLIPPED_COMPARISONS = {'GT': 'LT', 'LT': 'GT', 'GTE': 'LTE', 'LTE': 'GTE', 'EQ': 'EQ'}
+
+
+class _Update:
+    """Una actualización acumulativa del cuerpo del bucle."""
+    def __init__(self, name, kind, condition):
+        self.name = name            # nombre del acumulador
+        self.kind = kind            # 'add' o 'mult'
+        self.condition = condition  # None o (op, expresión invariante)
+        self.coefficient = []       # add: términos que multiplican a la variable del bucle
+        self.constant = []          # add: términos constantes / mult: el factor
+
+
+class _LoopAnalysis:
+    def __init__(self, node, context):
+        self.node = node
+        self.var = node.variable.name
+        self.declared = context.get("declared_vars", set())
+        self.updates = []
+        self.inputs = {}  # identificadores que el guard tiene que comprobar
+
+    def run(self):
+        """Devuelve True si el bucle completo tiene forma cerrada."""
+        step = self.node.iterable.step
+        if not isinstance(step, NumberNode) or step.value <= 0:
+            return False
+
+        candidates = []
+        for stmt in self.node.body:
+            if isinstance(stmt, AssignNode):
+                candidates.append((stmt, None))
+            elif isinstance(stmt, IfNode) and stmt.else_body is None:
+                if not all(isinstance(inner, AssignNode) for inner in stmt.body):
+                    return False
+                candidates.extend((inner, stmt.condition) for inner in stmt.body)
+            else:
+                return False
+        # Un cuerpo sin actualizaciones (sólo comentarios) no tiene nada que
+        # acelerar, y el condicional de un if vacío no se analizó
+        if not candidates:
+            return False
+
+        names = [stmt.target.name for stmt, _ in candidates if isinstance(stmt.target, IdentifierNode)]
+        if len(names) != len(candidates) or len(set(names)) != len(names):
+            return False
+        # Los acumuladores tienen que existir antes del bucle
+        if self.var in names or not all(name in self.declared for name in names):
+            return False
+        self.accumulators = set(names)
+
+        if not (self.is_invariant(self.node.iterable.start) and self.is_invariant(self.node.iterable.stop)):
+            return False
+
+        for stmt, condition in candidates:
+            update = self.analyze_update(stmt, condition)
+            if update is None:
+                return False
+            self.updates.append(update)
+            self.inputs.setdefault(update.name, None)
+        return True
+
+    def is_invariant(self, node):
+        """Expresión entera que no cambia durante el bucle."""
+        if isinstance(node, NumberNode):
+            return True
+        if isinstance(node, IdentifierNode):
+            if node.name == self.var or node.name in self.accumulators or node.name not in self.declared:
+                return False
+            self.inputs.setdefault(node.name, None)
+            return True
+        if isinstance(node, BinOpNode) and node.op in INTEGER_OPERATORS:
+            return self.is_invariant(node.left) and self.is_invariant(node.right)
+        return False
+
+    def analyze_condition(self, condition):
+        if not isinstance(condition, BinOpNode) or condition.op not in FLIPPED_COMPARISONS:
+            return None
+        left, right = condition.left, condition.right
+        if isinstance(left, IdentifierNode) and left.name == self.var and self.is_invariant(right):
+            return condition.op, right
+        if isinstance(right, IdentifierNode) and right.name == self.var and self.is_invariant(left):
+            return FLIPPED_COMPARISONS[condition.op], left
+        return None
+
+    def analyze_update(self, stmt, condition):
+        if condition is not None:
+            condition = self.analyze_condition(condition)
+            if condition is None:
+                return None
+
+        name = stmt.target.name
+        value = stmt.value
+
+        # acc = acc * c  /  acc = c * acc
+        if isinstance(value, BinOpNode) and value.op == 'MULT':
+            for acc_side, factor in ((value.left, value.right), (value.right, value.left)):
+                if isinstance(acc_side, IdentifierNode) and acc_side.name == name and self.is_invariant(factor):
+                    update = _Update(name, 'mult', condition)
+                    update.constant = [factor]
+                    return update
+            return None
+
+        # acc = acc + a * i + b  (cualquier combinación lineal con + y -)
+        update = _Update(name, 'add', condition)
+        acc_sign = self.linearize(value, name, 1, update)
+        if acc_sign != 1:
+            return None
+        return update
+
+    def linearize(self, node, name, sign, update):
+        """
+        Descompone node (multiplicado por sign) en términos de update.
+        Devuelve cuántas veces aparece el acumulador (con signo), o None si
+        la expresión no es lineal.
+        """
+        if isinstance(node, IdentifierNode) and node.name == name:
+            return sign
+        if isinstance(node, IdentifierNode) and node.name == self.var:
+            update.coefficient.append((sign, None))
+            return 0
+        if isinstance(node, BinOpNode) and node.op in ('PLUS', 'MINUS'):
+            left = self.linearize(node.left, name, sign, update)
+            right_sign = sign if node.op == 'PLUS' else -sign
+            right = self.linearize(node.right, name, right_sign, update)
+            if left is None or right is None:
+                return None
+            return left + right
+        if isinstance(node, BinOpNode) and node.op == 'MULT':
+            # a * i  /  i * a
+            for var_side, factor in ((node.left, node.right), (node.right, node.left)):
+                if isinstance(var_side, IdentifierNode) and var_side.name == self.var and self.is_invariant(factor):
+                    update.coefficient.append((sign, factor))
+                    return 0
+        if self.is_invariant(node):
+            update.constant.append((sign, node))
+            return 0
+        return None
+
+
+def _sum_terms(terms, js):
+    """Suma de términos (signo, nodo); un nodo None vale 1. None si no hay términos."""
+    parts = []
+    for sign, node in terms:
+        value = "1" if node is None else js(node)
+        # En modo compacto value puede venir sin paréntesis externos (x-y)
+        parts.append(value if sign > 0 else f"-({value})")
+    return "(" + " + ".join(parts) + ")" if parts else None
+
+
+def _linear_js(a, x, b):
+    """JavaScript de a * x + b, omitiendo los términos que no existen."""
+    parts = []
+    if a is not None:
+        parts.append(f"{a} * ({x})")
+    if b is not None:
+        parts.append(b)
+    return " + ".join(parts) if parts else "0"
+
+
+def closed_form_js(node, indent, context):
+    """
+    Reescritor para ForNode.to_js: devuelve el JavaScript de la forma cerrada
+    del bucle, o None si no se puede probar que sea equivalente.
+    """
+    if not isinstance(node.iterable, RangeNode) or not isinstance(node.variable, IdentifierNode):
+        return None
+    analysis = _LoopAnalysis(node, context)
+    if not analysis.run():
+        return None
+
+    minified = bool(context.get("minify"))
+    sp = "" if minified else " "
+
+    def js(expr):
+        return expr.to_js(0, context)
+
+    start = f"({js(node.iterable.start)})"
+    stop = f"({js(node.iterable.stop)})"
+    step = str(node.iterable.step.value)
+    inputs = [IdentifierNode(name).to_js(0, context) for name in analysis.inputs]
+
+    # Código dentro del guard: (nombre, expresión) de temporales con '$',
+    # que MiniPython no permite en sus identificadores
+    lines = [("$n", f"Math.max(0, Math.ceil(({stop} - {start}) / {step}))")]
+    checked = list(inputs)
+    assignments = []
+    for k, update in enumerate(analysis.updates):
+        acc = IdentifierNode(update.name).to_js(0, context)
+        lo, hi, count = "0", "$n", "$n"
+        if update.condition is not None:
+            op, bound = update.condition
+            q = f"(({js(bound)}) - {start}) / {step}"
+            lo, hi, count = f"$lo{k}", f"$hi{k}", f"$c{k}"
+            lo_js = {
+                'GT': f"Math.max(0, Math.floor({q}) + 1)",
+                'GTE': f"Math.max(0, Math.ceil({q}))",
+                'EQ': f"Math.max(0, Math.ceil({q}))",
+            }.get(op, "0")
+            hi_js = {
+                'LT': f"Math.min($n, Math.ceil({q}))",
+                'LTE': f"Math.min($n, Math.floor({q}) + 1)",
+                'EQ': f"Math.min($n, Math.floor({q}) + 1)",
+            }.get(op, "$n")
+            lines.append((lo, lo_js))
+            lines.append((hi, hi_js))
+            lines.append((count, f"Math.max(0, {hi} - {lo})"))
+
+        if update.kind == 'mult':
+            factor = f"({js(update.constant[0])})"
+            lines.append((f"$p{k}", f"{factor} ** {count}"))
+            lines.append((f"$v{k}", f"{acc} * $p{k}"))
+            checked += [f"$p{k}", f"$v{k}"]
+        else:
+            a = _sum_terms(update.coefficient, js)
+            b = _sum_terms(update.constant, js)
+            # Suma de la variable del bucle sobre los índices [lo, hi)
+            sum_i = f"{count} * {start} + {step} * {count} * ({lo} + {hi} - 1) / 2"
+            value = [acc]
+            if a is not None:
+                value.append(f"{a} * ({sum_i})")
+            if b is not None:
+                value.append(f"{b} * {count}")
+            lines.append((f"$v{k}", " + ".join(value)))
+            # Cota de todas las sumas parciales: el término es lineal, así que
+            # su valor absoluto máximo está en el primer o el último índice
+            first = _linear_js(a, f"{start} + {step} * {lo}", b)
+            last = _linear_js(a, f"{start} + {step} * ({hi} - 1)", b)
+            lines.append((
+                f"$b{k}",
+                f"Math.abs({acc}) + {count} * Math.max(Math.abs({first}), Math.abs({last}))"
+            ))
+            checked += [f"$v{k}", f"$b{k}"]
+        assignments.append(f"{acc}{sp}={sp}$v{k};")
+
+    # Las expresiones sólo contienen números, identificadores y operadores,
+    # así que en modo compacto se pueden quitar todos los espacios
+    if minified:
+        lines = [f"const {name}={expr.replace(' ', '')};" for name, expr in lines]
+    else:
+        lines = [f"const {name} = {expr};" for name, expr in lines]
+
+    typeof_guard = f"{sp}&&{sp}".join(f'typeof {name}{sp}==={sp}"number"' for name in inputs)
+    safe_guard = f"[{','.join(checked)}].every(Number.isSafeInteger)"
+
+    # Bloque: {let $ok=...; if ($ok) {...temporales...; $ok=...; if ($ok) {...}} if (!$ok) {bucle}}
+    loop = node.loop_js(indent + 2 if not minified else 0, context)
+    if minified:
+        return (
+            f"{{let $ok={typeof_guard};if($ok){{{''.join(lines)}$ok={safe_guard};"
+            f"if($ok){{{''.join(assignments)}}}}}if(!$ok){{{loop}}}}}"
+        )
+
+    pad = " " * (indent * 4)
+    out = [f"{pad}{{", f"{pad}    let $ok = {typeof_guard};", f"{pad}    if ($ok) {{"]
+    out += [f"{pad}        {line}" for line in lines]
+    out.append(f"{pad}        $ok = {safe_guard};")
+    out.append(f"{pad}        if ($ok) {{")
+    out += [f"{pad}            {line}" for line in assignments]
+    out.append(f"{pad}        }}")
+    out.append(f"{pad}    }}")
+    out.append(f"{pad}    if (!$ok) {{")
+    out.append(loop)
+    out.append(f"{pad}    }}")
+    out.append(f"{pad}}}")
+    return "\n".join(out)
@@ -1,11 +1,117 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from lexer import Lexer
-from parser import Parser
-import traceback
-import re
-from transpiler import Transpiler
+from pydantic import BaseModel, ValidationError
+from typing import List, Literal
+import os
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from result_cache import ResultCache, make_key
+from pipeline import ARTIFACTS, compile_with_metrics, compile_stages, compile_batch, format_error_message, warm_up
+from compression import CompressionMiddleware
+from live_sessions import LiveSession
+from budgets import CompileBudget, CompileLimitExceeded
+from symbols import SymbolIndexer
+import metrics
+from time import perf_counter
+
+# Maximum number of VM instructions a program may execute on /run
+MAX_RUN_STEPS = 1_000_000
+# Maximum wall-clock seconds for the "python" engine on /run
+MAX_RUN_SECONDS = 2.0
+# /run executes in a child process that is killed after this many seconds,
+# even in the middle of a single long operation
+MAX_RUN_WALL_SECONDS = MAX_RUN_SECONDS + 1.0
+# Memory a /run child process may allocate beyond what it inherits
+MAX_RUN_MEMORY_BYTES = 256 * 1024 * 1024
+
+# In-memory cache of /compile responses (set COMPILE_CACHE_ENTRIES=0 to disable)
+compile_cache = ResultCache(
+    max_entries=int(os.environ.get("COMPILE_CACHE_ENTRIES", "1024")),
+    max_bytes=int(os.environ.get("COMPILE_CACHE_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.environ["COMPILE_CACHE_TTL"]) if os.environ.get("COMPILE_CACHE_TTL") else None
+)
+
+# Compilation runs on a process pool so a large program never blocks the event
+# loop (set COMPILE_WORKERS=0 to compile everything inline)
+COMPILE_WORKERS = int(os.environ.get("COMPILE_WORKERS", str(os.cpu_count() or 1)))
+# Maximum compilations running or waiting on the pool before answering 503
+COMPILE_QUEUE_DEPTH = int(os.environ.get("COMPILE_QUEUE_DEPTH", str(4 * max(COMPILE_WORKERS, 1))))
+# Inputs up to this size are cheaper to compile inline than to ship to a worker
+INLINE_MAX_BYTES = int(os.environ.get("COMPILE_INLINE_MAX_BYTES", "2048"))
+# Seconds a rejected client should wait before retrying
+RETRY_AFTER_SECONDS = 1
+
+compile_pool = None
+pending_compiles = 0
+
+def env_limit(name, default, kind=int):
+    # A limit set to 0 is disabled
+    value = kind(os.environ.get(name, str(default)))
+    return value if value > 0 else None
+
+# Resource limits for a single compilation; exceeding one answers 413 (input
+# too large) or 422 (too deep, too much output or too slow)
+compile_budget = CompileBudget(
+    max_source_bytes=env_limit("COMPILE_MAX_SOURCE_BYTES", 1024 * 1024),
+    max_tokens=env_limit("COMPILE_MAX_TOKENS", 500_000),
+    max_nodes=env_limit("COMPILE_MAX_NODES", 500_000),
+    max_depth=env_limit("COMPILE_MAX_DEPTH", 100),
+    # The recursive renderers overflow the stack at about 330 levels
+    max_tree_depth=env_limit("COMPILE_MAX_TREE_DEPTH", 250),
+    max_output_size=env_limit("COMPILE_MAX_OUTPUT_SIZE", 16 * 1024 * 1024),
+    deadline_seconds=env_limit("COMPILE_DEADLINE_SECONDS", 5.0, float)
+)
+
+# Directory where /compile saves per-request profiles; unset disables profiling.
+# When set, a request with the header "X-Compile-Profile: 1" is compiled under
+# cProfile and answered with an X-Profile-Id header naming the saved files.
+PROFILE_DIR = os.environ.get("COMPILE_PROFILE_DIR")
+# Most recent profiles kept in PROFILE_DIR; older ones are deleted
+PROFILE_MAX_FILES = int(os.environ.get("COMPILE_PROFILE_MAX_FILES", "20"))
+if PROFILE_DIR:
+    # cProfile and pstats are only imported when profiling is enabled
+    from profiling import CompileProfiler
+
+# Compile a representative program at startup, in this process and on every
+# pool worker, before the server accepts requests (set COMPILE_WARMUP=0 to skip)
+COMPILE_WARMUP = os.environ.get("COMPILE_WARMUP", "1") != "0"
+
+# Symbol indexes built by POST /symbols, kept so later queries can find them by
+# id, and the per-unit analyses they are assembled from: re-indexing an edited
+# program only re-parses the top-level statements and functions that changed
+symbol_indexer = SymbolIndexer(
+    max_indexes=int(os.environ.get("SYMBOL_INDEX_ENTRIES", "64")),
+    max_units=int(os.environ.get("SYMBOL_UNIT_ENTRIES", "4096")),
+    max_index_bytes=int(os.environ.get("SYMBOL_INDEX_BYTES", str(128 * 1024 * 1024))),
+    max_unit_bytes=int(os.environ.get("SYMBOL_UNIT_BYTES", str(64 * 1024 * 1024)))
+)
+
+# Live compile sessions over WebSocket (/live)
+LIVE_MAX_SESSIONS = int(os.environ.get("LIVE_MAX_SESSIONS", "100"))
+LIVE_MAX_SOURCE_BYTES = int(os.environ.get("LIVE_MAX_SOURCE_BYTES", str(256 * 1024)))
+# Estimated memory of the tokens and result a live session keeps for reuse
+LIVE_MAX_SESSION_BYTES = int(os.environ.get("LIVE_MAX_SESSION_BYTES", str(8 * 1024 * 1024)))
+# Sessions with no messages for this long are closed
+LIVE_IDLE_SECONDS = float(os.environ.get("LIVE_IDLE_SECONDS", "300"))
+# Edits arriving within this window of each other are compiled together
+LIVE_COALESCE_SECONDS = float(os.environ.get("LIVE_COALESCE_SECONDS", "0.05"))
+# Unprocessed messages buffered per session before reading is paused
+LIVE_MAX_PENDING_MESSAGES = 256
+
+live_sessions = set()
+
+# /compile/stream sends the JavaScript in records of roughly this many characters
+STREAM_CHUNK_CHARS = int(os.environ.get("COMPILE_STREAM_CHUNK_CHARS", str(16 * 1024)))
+
+# Maximum programs accepted by one /compile/batch request
+BATCH_MAX_ITEMS = int(os.environ.get("COMPILE_BATCH_MAX_ITEMS", "1000"))
+# Maximum total size of the programs in one /compile/batch request
+BATCH_MAX_BYTES = int(os.environ.get("COMPILE_BATCH_MAX_BYTES", str(16 * 1024 * 1024)))
+# Programs sent to a worker per task; larger chunks amortize the IPC cost
+BATCH_CHUNK_SIZE = int(os.environ.get("COMPILE_BATCH_CHUNK_SIZE", "16"))
 
 app = FastAPI(
     title="Mini Python Compiler API",
@@ -22,49 +128,581 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli responses (negotiated with Accept-Encoding) from this size up
+# (set COMPRESSION_MIN_BYTES=0 to disable compression)
+COMPRESSION_MIN_BYTES = int(os.environ.get("COMPRESSION_MIN_BYTES", "1024"))
+if COMPRESSION_MIN_BYTES > 0:
+    app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_BYTES)
+
 class CodeInput(BaseModel):
     code: str
+    minify: bool = False  # Emit compact JavaScript (no indentation/newlines)
+    mangle: bool = False  # Shorten local identifiers inside functions
+    optimize_loops: bool = False  # Closed-form rewrite of accumulating for loops
+    # Subset of the response fields to build; later pipeline stages are skipped
+    # when nothing requested depends on them
+    artifacts: List[Literal["tokens", "output", "ast", "javascript"]] = list(ARTIFACTS)
+    # "repr": one "('ID', 'x', 1)" string per token
+    # "columnar": {"names", "kinds", "values", "lines"} arrays, far smaller
+    token_format: Literal["repr", "columnar"] = "repr"
+
+class BatchProgram(BaseModel):
+    id: str
+    code: str
+
+class BatchInput(BaseModel):
+    programs: List[BatchProgram]
+    # Options shared by every program in the batch (see CodeInput)
+    minify: bool = False
+    mangle: bool = False
+    optimize_loops: bool = False
+    artifacts: List[Literal["tokens", "output", "ast", "javascript"]] = list(ARTIFACTS)
+    token_format: Literal["repr", "columnar"] = "repr"
+    # Return NDJSON, one line per program in completion order
+    stream: bool = False
+
+class SymbolsInput(BaseModel):
+    code: str
+
+class RunInput(BaseModel):
+    code: str
+    # "vm": bytecode VM with a step budget
+    # "python": compiled to a native Python code object with a time limit
+    engine: Literal["vm", "python"] = "vm"
+
+@app.on_event("startup")
+def start_compile_pool():
+    global compile_pool
+    if COMPILE_WARMUP:
+        # Before the pool forks, so forked workers inherit the warm state
+        warm_up()
+    if COMPILE_WORKERS > 0:
+        compile_pool = ProcessPoolExecutor(max_workers=COMPILE_WORKERS)
+        if COMPILE_WARMUP:
+            # The pool starts its processes on the first submit; doing it here
+            # keeps the process start-up out of the first large request
+            for future in [compile_pool.submit(warm_up) for _ in range(COMPILE_WORKERS)]:
+                future.result()
+
+@app.on_event("shutdown")
+def stop_compile_pool():
+    if compile_pool is not None:
+        compile_pool.shutdown(cancel_futures=True)
+
+def reject_if_saturated():
+    if pending_compiles >= COMPILE_QUEUE_DEPTH:
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy compiling other programs, please retry",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
+
+async def run_compile(input: CodeInput, profiler=None):
+    """
+    Compiles inline for small inputs and on the process pool otherwise,
+    rejecting with 503 when too many compilations are already queued.
+    Returns (payload, stats) as produced by compile_with_metrics.
+
+    Profiled compiles run on a thread of this process instead, since the
+    profiler has to live where the compile runs.
+    """
+    global pending_compiles
+    # Oversized inputs are rejected before they are shipped to a worker
+    compile_budget.check_source(input.code)
+    args = (
+        input.code, input.minify, input.mangle, input.optimize_loops, tuple(input.artifacts), compile_budget,
+        input.token_format
+    )
+    if profiler is None and (compile_pool is None or len(input.code) <= INLINE_MAX_BYTES):
+        return compile_with_metrics(*args)
+
+    reject_if_saturated()
+    pending_compiles += 1
+    try:
+        loop = asyncio.get_running_loop()
+        if profiler is not None:
+            return await loop.run_in_executor(None, profiler.compile, *args)
+        return await loop.run_in_executor(compile_pool, compile_with_metrics, *args)
+    finally:
+        pending_compiles -= 1
+
+def record_compile_stats(stats):
+    for stage, seconds in stats["stages"].items():
+        metrics.stage_duration.observe(seconds, stage)
+    metrics.token_count.observe(stats["tokens"])
+    if "parse" in stats["stages"]:
+        metrics.node_count.observe(stats["nodes"])
 
-def format_error_message(error, code):
-    # Extract the line number from the error message if it exists
-    line_match = re.search(r'line (\d+)', str(error))
-    line_number = int(line_match.group(1)) if line_match else None
-    
-    # Get the specific line of code
-    code_lines = code.split('\n')
-    error_line = code_lines[line_number - 1] if line_number and line_number <= len(code_lines) else None
-    
-    # Build the error message
-    error_msg = f"Error in line {line_number}:\n" if line_number else "Error:\n"
-    if error_line:
-        error_msg += f"\n{error_line}\n"
-        # Add a position indicator if it's a syntax error
-        if "SyntaxError" in str(error):
-            error_msg += " " * (len(error_line) - len(error_line.lstrip())) + "^\n"
-    error_msg += f"\n{str(error)}"
-    
-    return error_msg
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = perf_counter()
+    response = await call_next(request)
+    # Label by the matched endpoint rather than the raw path, so unknown URLs
+    # cannot grow the number of series without bound
+    endpoint = request.scope.get("endpoint")
+    label = endpoint.__name__ if endpoint is not None else "unmatched"
+    metrics.requests_total.inc(label, str(response.status_code))
+    metrics.request_duration.observe(perf_counter() - start, label)
+    return response
 
 @app.post("/compile")
-async def compile_code(input: CodeInput):
+async def compile_code(input: CodeInput, request: Request):
+    metrics.input_bytes.observe(len(input.code))
+    key = make_key(
+        input.code, input.minify, input.mangle, input.optimize_loops, sorted(set(input.artifacts)),
+        input.token_format
+    )
+    profiler = None
+    headers = {}
+    if PROFILE_DIR and request.headers.get("x-compile-profile") == "1":
+        # A profiled request always compiles, even if the result is cached
+        profiler = CompileProfiler(PROFILE_DIR, PROFILE_MAX_FILES)
+        headers["X-Profile-Id"] = profiler.id
+        cached = None
+    else:
+        cached = compile_cache.get(key)
+    if cached is not None:
+        metrics.cache_hits_total.inc()
+        is_error, value = cached
+        if is_error:
+            status_code, detail = value
+            raise HTTPException(status_code=status_code, detail=detail, headers={"Server-Timing": 'cache;desc="hit"'})
+        return JSONResponse(value, headers={"Server-Timing": 'cache;desc="hit"'})
+
     try:
-        # Use the lexer to tokenize the code
-        tokens = Lexer(input.code)  # Returns tokens directly
-        
-        # Use the parser to analyze the tokens
-        parser = Parser(tokens)
-        ast = parser.parse()
-
-        # Transpile AST to JavaScript
-        transpiler = Transpiler(ast)
-        js_code = transpiler.transpile()
-        
-        return {
-            "output": str(ast),
-            "tokens": [str(token) for token in tokens],
-            "ast": ast.to_tree(),
-            "javascript": js_code
-        }
+        result, stats = await run_compile(input, profiler)
+    except HTTPException:
+        raise
+    except CompileLimitExceeded as e:
+        metrics.compile_errors_total.inc()
+        # Deadlines depend on server load, every other limit on the input only
+        if e.limit != "deadline":
+            compile_cache.put(key, (e.status_code, str(e)), is_error=True)
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=headers or None)
+    except Exception as e:
+        metrics.compile_errors_total.inc()
+        error_msg = format_error_message(e, input.code)
+        print(error_msg)  # Print to server logs
+        # Errors are cached too, so resubmitting a broken program is cheap
+        compile_cache.put(key, (400, error_msg), is_error=True)
+        raise HTTPException(status_code=400, detail=error_msg, headers=headers or None)
+
+    record_compile_stats(stats)
+    compile_cache.put(key, result)
+    # The payload is already plain JSON types, so FastAPI's per-value encoding
+    # pass is skipped. Server-Timing carries the per-stage durations, shown by
+    # the browser devtools next to the request.
+    headers["Server-Timing"] = metrics.server_timing(stats["stages"])
+    return JSONResponse(result, headers=headers)
+
+def next_stream_records(stages):
+    """
+    Advances a compile_stages generator and returns the next records to
+    send: one per artifact, except that consecutive JavaScript pieces are
+    merged up to STREAM_CHUNK_CHARS. Returns [] once the generator is done.
+    """
+    records = []
+    javascript = []
+    size = 0
+    for artifact, value in stages:
+        if artifact != "javascript":
+            records.append((artifact, value))
+            break
+        javascript.append(value)
+        size += len(value)
+        if size >= STREAM_CHUNK_CHARS:
+            break
+    if javascript:
+        records.insert(0, ("javascript", "".join(javascript)))
+    return records
+
+@app.post("/compile/stream")
+async def compile_code_stream(input: CodeInput):
+    """
+    Streaming /compile: newline-delimited JSON with one record per artifact
+    as soon as its stage finishes ({"type": "tokens", "tokens": ...}), the
+    JavaScript split across several {"type": "javascript", "javascript": ...}
+    records to be concatenated, and a final {"type": "done", ...} or
+    {"type": "error", "status": ..., "detail": ...} record.
+    """
+    metrics.input_bytes.observe(len(input.code))
+    try:
+        compile_budget.check_source(input.code)
+    except CompileLimitExceeded as e:
+        metrics.compile_errors_total.inc()
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    key = make_key(
+        input.code, input.minify, input.mangle, input.optimize_loops, sorted(set(input.artifacts)),
+        input.token_format
+    )
+    cached = compile_cache.get(key)
+    if cached is None:
+        # Stages run on threads of this process; they count against the
+        # same queue depth as pool compilations
+        reject_if_saturated()
+
+    async def records():
+        global pending_compiles
+        if cached is not None:
+            metrics.cache_hits_total.inc()
+            is_error, value = cached
+            if is_error:
+                status_code, detail = value
+                yield {"type": "error", "status": status_code, "detail": detail}
+            else:
+                for artifact, data in value.items():
+                    yield {"type": artifact, artifact: data}
+                yield {"type": "done", "status": 200, "cache": "hit"}
+            return
+
+        if pending_compiles >= COMPILE_QUEUE_DEPTH:
+            # Other requests filled the queue since this one was admitted
+            yield {"type": "error", "status": 503, "detail": "Server is busy compiling other programs, please retry"}
+            return
+
+        # Results are not cached here: that would mean holding every artifact
+        # until the end, which is what streaming avoids
+        stages = compile_stages(
+            input.code, input.minify, input.mangle, input.optimize_loops, tuple(input.artifacts),
+            compile_budget, input.token_format
+        )
+        loop = asyncio.get_running_loop()
+        pending_compiles += 1
+        try:
+            while True:
+                # Stages run on a thread so the event loop keeps serving
+                # other requests while a large program compiles
+                batch = await loop.run_in_executor(None, next_stream_records, stages)
+                if not batch:
+                    break
+                for artifact, value in batch:
+                    if artifact == "stats":
+                        record_compile_stats(value)
+                        yield {"type": "done", "status": 200, "timings": value["stages"]}
+                    else:
+                        yield {"type": artifact, artifact: value}
+        except CompileLimitExceeded as e:
+            metrics.compile_errors_total.inc()
+            yield {"type": "error", "status": e.status_code, "detail": str(e)}
+        except Exception as e:
+            metrics.compile_errors_total.inc()
+            yield {"type": "error", "status": 400, "detail": format_error_message(e, input.code)}
+        finally:
+            pending_compiles -= 1
+
+    async def ndjson():
+        async for record in records():
+            yield json.dumps(record) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+def batch_entry(program: BatchProgram, status, value):
+    if status == 200:
+        return {"id": program.id, "status": 200, "result": value}
+    return {"id": program.id, "status": status, "detail": value}
+
+async def iter_batch_results(input: BatchInput):
+    """
+    Yields (position, batch_entry) for every program as soon as it is
+    available: cache hits first, then the rest in completion order. Uncached
+    programs are compiled in chunks of BATCH_CHUNK_SIZE, with up to one chunk
+    per worker in flight. Those in-flight slots are reserved in
+    pending_compiles for the whole batch; programs that find no free slot
+    are answered with 503.
+    """
+    global pending_compiles
+    options = (
+        input.minify, input.mangle, input.optimize_loops, sorted(set(input.artifacts)), input.token_format
+    )
+    keys = {}
+    todo = []
+    for index, program in enumerate(input.programs):
+        key = make_key(program.code, *options)
+        cached = compile_cache.get(key)
+        if cached is not None:
+            metrics.cache_hits_total.inc()
+            is_error, value = cached
+            yield index, batch_entry(program, *value) if is_error else batch_entry(program, 200, value)
+            continue
+        try:
+            compile_budget.check_source(program.code)
+        except CompileLimitExceeded as e:
+            metrics.compile_errors_total.inc()
+            yield index, batch_entry(program, e.status_code, str(e))
+            continue
+        keys[index] = key
+        todo.append((index, program.code))
+
+    args = (
+        input.minify, input.mangle, input.optimize_loops, tuple(input.artifacts), compile_budget,
+        input.token_format
+    )
+    chunks = [todo[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(todo), BATCH_CHUNK_SIZE)]
+
+    def finish(results):
+        for index, status, value, stats in results:
+            if status == 200:
+                record_compile_stats(stats)
+                compile_cache.put(keys[index], value)
+            else:
+                metrics.compile_errors_total.inc()
+                if stats is not None:
+                    compile_cache.put(keys[index], (status, value), is_error=True)
+            yield index, batch_entry(input.programs[index], status, value)
+
+    if compile_pool is None:
+        for chunk in chunks:
+            for result in finish(compile_batch(chunk, *args)):
+                yield result
+        return
+
+    slots = min(COMPILE_WORKERS, len(chunks), COMPILE_QUEUE_DEPTH - pending_compiles)
+    if slots <= 0:
+        # Other requests filled the queue since the batch was admitted
+        for index, _ in todo:
+            yield index, batch_entry(
+                input.programs[index], 503, "Server is busy compiling other programs, please retry"
+            )
+        return
+
+    loop = asyncio.get_running_loop()
+    remaining = iter(chunks)
+    running = set()
+    pending_compiles += slots
+    try:
+        while True:
+            for chunk in remaining:
+                running.add(loop.run_in_executor(compile_pool, compile_batch, chunk, *args))
+                if len(running) >= slots:
+                    break
+            if not running:
+                break
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for result in finish(task.result()):
+                    yield result
+    finally:
+        # The client went away: drop the chunks that have not started yet
+        for task in running:
+            task.cancel()
+        pending_compiles -= slots
+
+@app.post("/compile/batch")
+async def compile_batch_code(input: BatchInput):
+    if len(input.programs) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"A batch holds at most {BATCH_MAX_ITEMS} programs"
+        )
+    size = sum(len(program.code.encode("utf-8")) for program in input.programs)
+    if size > BATCH_MAX_BYTES:
+        raise HTTPException(
+            status_code=413, detail=f"Batch programs total {size} bytes, the limit is {BATCH_MAX_BYTES}"
+        )
+    if compile_pool is not None:
+        reject_if_saturated()
+
+    if input.stream:
+        async def ndjson():
+            async for _, entry in iter_batch_results(input):
+                yield json.dumps(entry) + "\n"
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    # Same order as the request
+    results = [None] * len(input.programs)
+    async for index, entry in iter_batch_results(input):
+        results[index] = entry
+    return JSONResponse({"results": results})
+
+async def push_live_result(websocket: WebSocket, session: LiveSession):
+    # Checking for a no-op change lexes the source, which takes ~100 ms at
+    # LIVE_MAX_SOURCE_BYTES: too long for the event loop
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, session.cached_result)
+    if result is None:
+        try:
+            payload, stats = await run_compile(CodeInput(code=session.source, **session.options))
+            record_compile_stats(stats)
+            result = (False, payload)
+        except HTTPException as e:
+            # Pool saturated: report it without caching, the next edit retries
+            await websocket.send_json({"type": "busy", "version": session.version, "detail": e.detail})
+            return
+        except ValidationError as e:
+            result = (True, str(e))
+        except CompileLimitExceeded as e:
+            metrics.compile_errors_total.inc()
+            result = (True, str(e))
+        except Exception as e:
+            metrics.compile_errors_total.inc()
+            result = (True, format_error_message(e, session.source))
+        session.store_result(*result)
+
+    is_error, payload = result
+    if is_error:
+        await websocket.send_json({"type": "error", "version": session.version, "detail": payload})
+    else:
+        await websocket.send_json({"type": "result", "version": session.version, **payload})
+
+async def apply_live_message(websocket: WebSocket, session: LiveSession, message):
+    """Applies one client message; invalid ones are answered with an error record."""
+    try:
+        session.apply(json.loads(message))
+        return True
+    except ValueError as e:  # SessionError or malformed JSON
+        await websocket.send_json({"type": "error", "version": session.version, "detail": str(e)})
+        return False
+
+@app.websocket("/live")
+async def live_compile(websocket: WebSocket):
+    if len(live_sessions) >= LIVE_MAX_SESSIONS:
+        await websocket.close(code=1013)  # Try again later
+        return
+    await websocket.accept()
+    session = LiveSession(LIVE_MAX_SOURCE_BYTES, LIVE_MAX_SESSION_BYTES)
+    live_sessions.add(session)
+    inbox = asyncio.Queue(maxsize=LIVE_MAX_PENDING_MESSAGES)
+
+    async def read_messages():
+        try:
+            while True:
+                await inbox.put(await websocket.receive_text())
+        except WebSocketDisconnect:
+            await inbox.put(None)
+
+    reader = asyncio.create_task(read_messages())
+    try:
+        connected = True
+        while connected:
+            try:
+                message = await asyncio.wait_for(inbox.get(), timeout=LIVE_IDLE_SECONDS)
+            except asyncio.TimeoutError:
+                await websocket.close(code=1001)  # Idle session
+                break
+            if message is None:
+                break
+
+            # Collapse a burst of edits into a single compile. Each edit is
+            # applied as it arrives, so the session only ever holds the
+            # current source; a sender that never pauses still gets a
+            # compile every LIVE_MAX_PENDING_MESSAGES messages.
+            applied = await apply_live_message(websocket, session, message)
+            for _ in range(LIVE_MAX_PENDING_MESSAGES - 1):
+                try:
+                    message = await asyncio.wait_for(inbox.get(), timeout=LIVE_COALESCE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                if message is None:
+                    connected = False
+                    break
+                applied = await apply_live_message(websocket, session, message) or applied
+            if applied and connected:
+                await push_live_result(websocket, session)
+    finally:
+        reader.cancel()
+        live_sessions.discard(session)
+
+@app.get("/live/stats")
+async def live_stats():
+    return {
+        "sessions": len(live_sessions),
+        "max_sessions": LIVE_MAX_SESSIONS,
+        "bytes": sum(session.memory_bytes() for session in live_sessions)
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def export_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return compile_cache.stats()
+
+@app.post("/symbols")
+async def index_symbols(input: SymbolsInput):
+    """
+    Builds the symbol index of a program and returns its id, to be used with
+    the GET /symbols/{id} queries, with the functions it declares.
+    """
+    global pending_compiles
+    try:
+        compile_budget.check_source(input.code)
+        reject_if_saturated()
+        pending_compiles += 1
+        try:
+            # On a thread: indexing a large program parses all of it
+            loop = asyncio.get_running_loop()
+            index, analyzed, reused = await loop.run_in_executor(
+                None, symbol_indexer.index, input.code, compile_budget
+            )
+        finally:
+            pending_compiles -= 1
+    except HTTPException:
+        raise
+    except CompileLimitExceeded as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=format_error_message(e, input.code))
+    return {**index.summary(), "units": {"analyzed": analyzed, "reused": reused}}
+
+def get_symbol_index(index_id):
+    index = symbol_indexer.get(index_id)
+    if index is None:
+        raise HTTPException(
+            status_code=404, detail="Unknown or expired symbol index, POST the source to /symbols again"
+        )
+    return index
+
+@app.get("/symbols/{index_id}")
+async def list_symbols(index_id: str):
+    index = get_symbol_index(index_id)
+    return {"id": index.id, "symbols": [symbol.to_dict() for symbol in index.symbols]}
+
+@app.get("/symbols/{index_id}/at")
+async def symbol_at(index_id: str, line: int, column: int):
+    """Go to definition / find references: the symbol under a 1-based line and column."""
+    symbol = get_symbol_index(index_id).symbol_at(line, column)
+    if symbol is None:
+        raise HTTPException(status_code=404, detail=f"No symbol at line {line}, column {column}")
+    return symbol.to_dict()
+
+@app.get("/symbols/{index_id}/functions/{name}")
+async def function_signature(index_id: str, name: str):
+    """Parameters and definition of every function with this name, nested ones included."""
+    functions = get_symbol_index(index_id).functions_named(name)
+    if not functions:
+        raise HTTPException(status_code=404, detail=f"No function named {name}")
+    return {"functions": [symbol.to_dict() for symbol in functions]}
+
+@app.post("/run")
+async def run_code(input: RunInput):
+    """
+    Compiles with the same limits as /compile on a thread, then executes in a
+    child process with a hard time and memory limit, so a runaway program
+    never blocks the event loop.
+    """
+    # The execution engines are loaded on first use; most requests only compile
+    from sandbox import run_program
+    global pending_compiles
+    try:
+        compile_budget.check_source(input.code)
+        reject_if_saturated()
+        pending_compiles += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, partial(
+                    run_program, input.code, input.engine, compile_budget,
+                    max_steps=MAX_RUN_STEPS, timeout=MAX_RUN_SECONDS,
+                    wall_seconds=MAX_RUN_WALL_SECONDS, max_memory=MAX_RUN_MEMORY_BYTES
+                )
+            )
+        finally:
+            pending_compiles -= 1
+    except HTTPException:
+        raise
+    except CompileLimitExceeded as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         error_msg = format_error_message(e, input.code)
         print(error_msg)  # Print to server logs
@@ -76,7 +714,18 @@ async def root():
         "message": "Welcome to Mini Python Compiler API",
         "docs": "/docs",
         "endpoints": {
-            "/compile": "POST - Compile and parse Python-like code"
+            "/compile": "POST - Compile and parse Python-like code",
+            "/compile/stream": "POST - Like /compile, streamed as NDJSON records while each stage finishes",
+            "/compile/batch": "POST - Compile many programs in parallel (optionally streamed as NDJSON)",
+            "/run": "POST - Execute Python-like code on the server",
+            "/symbols": "POST - Index the symbols of a program for the /symbols/{id} queries",
+            "/symbols/{id}": "GET - Every function, parameter and variable with its definitions and references",
+            "/symbols/{id}/at": "GET - Symbol at ?line=&column= (go to definition, find references)",
+            "/symbols/{id}/functions/{name}": "GET - Parameters and definition of a function",
+            "/cache/stats": "GET - Hit/miss/eviction counters of the compile cache",
+            "/live": "WebSocket - Live compile session fed with text edits",
+            "/live/stats": "GET - Active live sessions and their memory use",
+            "/metrics": "GET - Request, cache and per-stage timing metrics (Prometheus format)"
         }
     }
 
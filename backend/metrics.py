@@ -0,0 +1,117 @@
+# metrics.py
+
+from bisect import bisect_left
+
+# Límites de los histogramas de duración, en segundos
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Límites de los histogramas de tamaño (bytes, tokens, nodos)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.values = {}
+
+    def inc(self, *label_values, amount=1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self.series = {}  # label_values -> [conteos por bucket..., +Inf, suma]
+
+    def observe(self, value, *label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+        # Se guarda sólo el bucket exacto; los acumulados se calculan al exportar
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                labels = _format_labels(self.labels + ("le",), label_values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Conjunto de métricas exportadas en el formato de texto de Prometheus."""
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, labels=()):
+        metric = Counter(name, help_text, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, buckets, labels=()):
+        metric = Histogram(name, help_text, buckets, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+requests_total = registry.counter(
+    "minipython_requests_total", "HTTP requests by endpoint and status code", ("endpoint", "status")
+)
+compile_errors_total = registry.counter(
+    "minipython_compile_errors_total", "Programs rejected by the lexer, parser or transpiler"
+)
+cache_hits_total = registry.counter(
+    "minipython_compile_cache_hits_total", "Compile requests answered from the result cache"
+)
+request_duration = registry.histogram(
+    "minipython_request_duration_seconds", "End-to-end handler latency", DURATION_BUCKETS, ("endpoint",)
+)
+stage_duration = registry.histogram(
+    "minipython_stage_duration_seconds", "Time spent in each compile stage", DURATION_BUCKETS, ("stage",)
+)
+input_bytes = registry.histogram(
+    "minipython_input_bytes", "Size of submitted programs", SIZE_BUCKETS
+)
+token_count = registry.histogram(
+    "minipython_tokens", "Tokens per compiled program", SIZE_BUCKETS
+)
+node_count = registry.histogram(
+    "minipython_ast_nodes", "AST nodes per compiled program", SIZE_BUCKETS
+)
+
+
+def server_timing(stages):
+    """Valor del header Server-Timing para {etapa: segundos}."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in stages.items())
@@ -4,6 +4,26 @@ from ast_nodes import (
     ForNode, RangeNode, FunctionDefNode, FunctionCallNode, ReturnNode
 )
 
+# Node type -> class, built once at import time. The constructors take the
+# same arguments (and optional else_body / step / value) the parser passes.
+NODE_CLASSES = {
+    'number': NumberNode,
+    'string': StringNode,
+    'boolean': BooleanNode,
+    'identifier': IdentifierNode,
+    'binop': BinOpNode,
+    'assign': AssignNode,
+    'print': PrintNode,
+    'if': IfNode,
+    'while': WhileNode,
+    'block': BlockNode,
+    'for': ForNode,
+    'range': RangeNode,
+    'function_def': FunctionDefNode,
+    'function_call': FunctionCallNode,
+    'return': ReturnNode
+}
+
 class NodeFactory:
     @staticmethod
     def create(node_type, *args):
@@ -12,25 +32,8 @@ class NodeFactory:
         node_type: string indicating the type of node to create
         args: arguments to pass to the node constructor
         """
-        node_creators = {
-            'number': lambda x: NumberNode(x),
-            'string': lambda x: StringNode(x),
-            'boolean': lambda x: BooleanNode(x),
-            'identifier': lambda x: IdentifierNode(x),
-            'binop': lambda left, op, right: BinOpNode(left, op, right),
-            'assign': lambda target, value: AssignNode(target, value),
-            'print': lambda value: PrintNode(value),
-            'if': lambda condition, body, else_body=None: IfNode(condition, body, else_body),
-            'while': lambda condition, body: WhileNode(condition, body),
-            'block': lambda statements: BlockNode(statements),
-            'for': lambda variable, iterable, body: ForNode(variable, iterable, body),
-            'range': lambda start, stop, step=None: RangeNode(start, stop, step),
-            'function_def': lambda name, params, body: FunctionDefNode(name, params, body),
-            'function_call': lambda name, args: FunctionCallNode(name, args),
-            'return': lambda value=None: ReturnNode(value)
-        }
-
-        if node_type not in node_creators:
+        node_class = NODE_CLASSES.get(node_type)
+        if node_class is None:
             raise ValueError(f"Unknown node type: {node_type}")
 
-        return node_creators[node_type](*args)
+        return node_class(*args)
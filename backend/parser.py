@@ -1,10 +1,23 @@
 from node_factory import NodeFactory
+from budgets import DEADLINE_CHECK_INTERVAL
 
 class Parser:
-    def __init__(self, tokens):
+    def __init__(self, tokens, budget=None):
         self.tokens = tokens
         self.pos = 0
         self.indent_stack = [0]
+        self.budget = budget  # CompileBudget opcional
+        self.node_count = 0
+        # Cantidad de nodos a la que toca consultar el presupuesto
+        self.next_check = DEADLINE_CHECK_INTERVAL if budget is not None else float('inf')
+
+    def create(self, node_type, *args):
+        """Crea un nodo con NodeFactory, llevando la cuenta para el presupuesto."""
+        self.node_count += 1
+        if self.node_count >= self.next_check:
+            self.budget.check_nodes(self.node_count)
+            self.next_check += DEADLINE_CHECK_INTERVAL
+        return NodeFactory.create(node_type, *args)
 
     def current(self):
         if self.pos < len(self.tokens):
@@ -24,7 +37,7 @@ class Parser:
             stmt = self.parse_statement()
             if stmt:
                 statements.append(stmt)
-        return NodeFactory.create('block', statements)
+        return self.create('block', statements)
 
     def parse_statement(self):
         token_type, value, line = self.current()
@@ -45,21 +58,21 @@ class Parser:
                 self.match('LPAREN')
                 args = self.parse_arguments()
                 self.match('RPAREN')
-                return NodeFactory.create('function_call', name, args)
+                return self.create('function_call', name, args)
             else:
                 # Es una asignación: x = expr
-                target = NodeFactory.create('identifier', value)
+                target = self.create('identifier', value)
                 self.match('ID')
                 self.match('ASSIGN')
                 expr = self.parse_expression()
-                return NodeFactory.create('assign', target, expr)
+                return self.create('assign', target, expr)
 
         elif token_type == 'PRINT':
             self.match('PRINT')
             self.match('LPAREN')
             expr = self.parse_expression()
             self.match('RPAREN')
-            return NodeFactory.create('print', expr)
+            return self.create('print', expr)
 
         elif token_type == 'IF':
             return self.parse_if()
@@ -115,7 +128,7 @@ class Parser:
             if self.current()[0] == 'DEDENT':
                 self.match('DEDENT')
             
-        return NodeFactory.create('if', condition, body, else_body)
+        return self.create('if', condition, body, else_body)
 
     def parse_while(self):
         self.match('WHILE')
@@ -131,7 +144,7 @@ class Parser:
 
         if self.current()[0] == 'DEDENT':
             self.match('DEDENT')
-        return NodeFactory.create('while', condition, body)
+        return self.create('while', condition, body)
 
     def parse_for(self):
         """
@@ -143,7 +156,7 @@ class Parser:
         token_type, var_name, line = self.current()
         if token_type != 'ID':
             raise SyntaxError(f"Expected variable name after 'for', got {token_type} at line {line}")
-        variable = NodeFactory.create('identifier', var_name)
+        variable = self.create('identifier', var_name)
         self.match('ID')
         
         # Consumir 'in'
@@ -166,7 +179,7 @@ class Parser:
         if self.current()[0] == 'DEDENT':
             self.match('DEDENT')
         
-        return NodeFactory.create('for', variable, iterable, body)
+        return self.create('for', variable, iterable, body)
 
     def parse_range(self):
         """
@@ -189,15 +202,15 @@ class Parser:
                 arg3 = self.parse_expression()
                 self.match('RPAREN')
                 # range(start, stop, step)
-                return NodeFactory.create('range', arg1, arg2, arg3)
+                return self.create('range', arg1, arg2, arg3)
             else:
                 self.match('RPAREN')
                 # range(start, stop)
-                return NodeFactory.create('range', arg1, arg2)
+                return self.create('range', arg1, arg2)
         else:
             self.match('RPAREN')
             # range(stop) -> start=0, stop=arg1
-            return NodeFactory.create('range', NodeFactory.create('number', '0'), arg1)
+            return self.create('range', self.create('number', '0'), arg1)
 
     def parse_function_def(self):
         """
@@ -220,7 +233,7 @@ class Parser:
             token_type, param_name, line = self.current()
             if token_type != 'ID':
                 raise SyntaxError(f"Expected parameter name, got {token_type} at line {line}")
-            params.append(NodeFactory.create('identifier', param_name))
+            params.append(self.create('identifier', param_name))
             self.match('ID')
             
             # Parámetros adicionales
@@ -229,7 +242,7 @@ class Parser:
                 token_type, param_name, line = self.current()
                 if token_type != 'ID':
                     raise SyntaxError(f"Expected parameter name, got {token_type} at line {line}")
-                params.append(NodeFactory.create('identifier', param_name))
+                params.append(self.create('identifier', param_name))
                 self.match('ID')
         
         self.match('RPAREN')
@@ -246,7 +259,7 @@ class Parser:
         if self.current()[0] == 'DEDENT':
             self.match('DEDENT')
         
-        return NodeFactory.create('function_def', func_name, params, body)
+        return self.create('function_def', func_name, params, body)
 
     def parse_return(self):
         """
@@ -257,9 +270,9 @@ class Parser:
         # Si lo siguiente no es un fin de línea, parsear la expresión
         if self.current()[0] not in ('DEDENT', 'EOF', 'INDENT'):
             expr = self.parse_expression()
-            return NodeFactory.create('return', expr)
+            return self.create('return', expr)
         else:
-            return NodeFactory.create('return', None)
+            return self.create('return', None)
 
     def parse_arguments(self):
         """
@@ -284,7 +297,7 @@ class Parser:
         while self.current()[0] in ('GT', 'LT', 'EQ', 'NEQ', 'GTE', 'LTE'):
             op = self.match('GT', 'LT', 'EQ', 'NEQ', 'GTE', 'LTE')[0]
             right = self.parse_arith_expression()
-            left = NodeFactory.create('binop', left, op, right)
+            left = self.create('binop', left, op, right)
 
         return left
 
@@ -293,7 +306,7 @@ class Parser:
         while self.current()[0] in ('PLUS', 'MINUS'):
             op = self.match('PLUS', 'MINUS')[0]
             right = self.parse_term()
-            left = NodeFactory.create('binop', left, op, right)
+            left = self.create('binop', left, op, right)
         return left
 
     def parse_term(self):
@@ -302,7 +315,7 @@ class Parser:
         while self.current()[0] in ('MULT', 'DIV'):
             op = self.match('MULT', 'DIV')[0]
             right = self.parse_factor()
-            left = NodeFactory.create('binop', left, op, right)
+            left = self.create('binop', left, op, right)
 
         return left
 
@@ -311,13 +324,13 @@ class Parser:
 
         if token_type == 'NUMBER':
             self.match('NUMBER')
-            return NodeFactory.create('number', value)
+            return self.create('number', value)
         elif token_type == 'STRING':
             self.match('STRING')
-            return NodeFactory.create('string', value)
+            return self.create('string', value)
         elif token_type in ('TRUE', 'FALSE'):
             self.match(token_type)
-            return NodeFactory.create('boolean', value)
+            return self.create('boolean', value)
         elif token_type == 'ID':
             name = value
             self.match('ID')
@@ -326,9 +339,9 @@ class Parser:
                 self.match('LPAREN')
                 args = self.parse_arguments()
                 self.match('RPAREN')
-                return NodeFactory.create('function_call', name, args)
+                return self.create('function_call', name, args)
             else:
-                return NodeFactory.create('identifier', name)
+                return self.create('identifier', name)
         elif token_type == 'LPAREN':
             self.match('LPAREN')
             expr = self.parse_expression()
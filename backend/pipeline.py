@@ -0,0 +1,291 @@
+# pipeline.py
+
+import re
+from time import perf_counter
+
+from lexer import Lexer
+from parser import Parser
+from transpiler import Transpiler
+from budgets import CompileLimitExceeded
+
+# Artifacts /compile can return, in pipeline order
+ARTIFACTS = ("tokens", "output", "ast", "javascript")
+# Encodings of the "tokens" artifact
+TOKEN_FORMATS = ("repr", "columnar")
+
+# Compiled by warm_up(); touches every statement, expression and range form
+# WARMUP_COPIES copies of it make up the large warm-up program
+WARMUP_COPIES = 20
+WARMUP_PROGRAM = """def scale(value, factor):
+    result = value * factor - (value / 2)
+    if result >= 10:
+        return result
+    else:
+        return result + 1
+total = 0
+label = "warm"
+done = False
+for i in range(10):
+    total = total + 2 * i + 1
+for j in range(1, 10, 2):
+    if j != 3:
+        total = total + scale(j, 2)
+while total < 1000:
+    total = total + 7
+print(total == 1000)
+print(label)
+print(done)
+print(total <= 5)
+print(total > 5)
+"""
+
+
+def format_error_message(error, code):
+    # Extract the line number from the error message if it exists
+    line_match = re.search(r'line (\d+)', str(error))
+    line_number = int(line_match.group(1)) if line_match else None
+    
+    # Get the specific line of code
+    code_lines = code.split('\n')
+    error_line = code_lines[line_number - 1] if line_number and line_number <= len(code_lines) else None
+    
+    # Build the error message
+    error_msg = f"Error in line {line_number}:\n" if line_number else "Error:\n"
+    if error_line:
+        error_msg += f"\n{error_line}\n"
+        # Add a position indicator if it's a syntax error
+        if "SyntaxError" in str(error):
+            error_msg += " " * (len(error_line) - len(error_line.lstrip())) + "^\n"
+    error_msg += f"\n{str(error)}"
+    
+    return error_msg
+
+
+def columnar_tokens(tokens):
+    """
+    Encodes tokens as parallel arrays instead of one Python tuple repr per
+    token. Each kind name is sent once in "names" and referenced by index:
+
+        {"names": ["ID", "ASSIGN", ...], "kinds": [0, 1, ...],
+         "values": ["x", "=", ...], "lines": [1, 1, ...]}
+    """
+    kinds, values, lines = zip(*tokens)  # never empty: there is always an EOF token
+    names = list(dict.fromkeys(kinds))
+    index = {name: position for position, name in enumerate(names)}
+    return {
+        "names": names,
+        "kinds": [index[kind] for kind in kinds],
+        "values": list(values),
+        "lines": list(lines),
+    }
+
+
+def compile_stages(code, minify=False, mangle=False, optimize_loops=False, artifacts=ARTIFACTS,
+                   budget=None, token_format="repr", profiler=None):
+    """
+    Runs the compile pipeline as a generator of (artifact, value) pairs,
+    yielding each artifact as soon as its stage finishes: "tokens" after
+    the lexer, "output" and "ast" after the parser, then "javascript" once
+    per top-level statement (concatenating the pieces gives the full
+    program). The last pair is ("stats", stats).
+
+    Only the requested artifacts are built, and the pipeline stops at the
+    earliest stage that produces all of them (tokens-only requests never
+    parse, AST-only requests never transpile).
+
+    stats holds the duration of every stage that ran, in seconds, plus the
+    token and AST node counts. Kept free of FastAPI imports so it can run
+    inside pool worker processes.
+
+    budget is an optional budgets.CompileBudget; every stage checks it and
+    raises CompileLimitExceeded as soon as a limit is crossed.
+
+    token_format picks the "tokens" encoding: "repr" (one string per token)
+    or "columnar" (see columnar_tokens).
+
+    profiler is an optional profiling.CompileProfiler; each stage runs
+    between its start(stage) and stop() calls.
+    """
+    if budget is not None:
+        budget = budget.start()
+    artifacts = set(artifacts)
+    stages = {}
+    stats = {"stages": stages, "tokens": 0, "nodes": 0}
+
+    # Use the lexer to tokenize the code
+    if profiler is not None:
+        profiler.start("lex")
+    start = perf_counter()
+    tokens = Lexer(code, budget)  # Returns tokens directly
+    stages["lex"] = perf_counter() - start
+    if profiler is not None:
+        profiler.stop()
+    stats["tokens"] = len(tokens)
+    if "tokens" in artifacts:
+        if profiler is not None:
+            profiler.start("tokens")
+        start = perf_counter()
+        if token_format == "columnar":
+            encoded = columnar_tokens(tokens)
+        else:
+            encoded = [str(token) for token in tokens]
+        stages["tokens"] = perf_counter() - start
+        if profiler is not None:
+            profiler.stop()
+        yield "tokens", encoded
+        del encoded
+    if not artifacts & {"output", "ast", "javascript"}:
+        yield "stats", stats
+        return
+    
+    # Use the parser to analyze the tokens
+    if profiler is not None:
+        profiler.start("parse")
+    start = perf_counter()
+    parser = Parser(tokens, budget)
+    ast = parser.parse()
+    if budget is not None:
+        # The renderers below recurse once per tree level
+        budget.check_tree(ast)
+    stages["parse"] = perf_counter() - start
+    if profiler is not None:
+        profiler.stop()
+    stats["nodes"] = parser.node_count
+    del tokens
+
+    if "output" in artifacts:
+        if profiler is not None:
+            profiler.start("output")
+        start = perf_counter()
+        output = str(ast)
+        stages["output"] = perf_counter() - start
+        if profiler is not None:
+            profiler.stop()
+        if budget is not None:
+            budget.check_output(output)
+            budget.check_deadline()
+        yield "output", output
+        del output
+    if "ast" in artifacts:
+        if profiler is not None:
+            profiler.start("tree")
+        start = perf_counter()
+        tree = ast.to_tree()
+        stages["tree"] = perf_counter() - start
+        if profiler is not None:
+            profiler.stop()
+        if budget is not None:
+            budget.check_output(tree)
+            budget.check_deadline()
+        yield "ast", tree
+        del tree
+
+    if "javascript" in artifacts:
+        # Transpile AST to JavaScript, one top-level statement at a time
+        transpiler = Transpiler(
+            ast,
+            minify=minify,
+            mangle=mangle,
+            optimize_loops=optimize_loops,
+            budget=budget
+        )
+        elapsed = 0.0
+        size = 0
+        chunks = transpiler.transpile_chunks()
+        while True:
+            if profiler is not None:
+                profiler.start("transpile")
+            start = perf_counter()
+            chunk = next(chunks, None)
+            elapsed += perf_counter() - start
+            if profiler is not None:
+                profiler.stop()
+            if chunk is None:
+                break
+            size += len(chunk)
+            if budget is not None:
+                budget.check_output_size(size)
+            yield "javascript", chunk
+        stages["transpile"] = elapsed
+    
+    yield "stats", stats
+
+
+def compile_with_metrics(code, minify=False, mangle=False, optimize_loops=False, artifacts=ARTIFACTS,
+                         budget=None, token_format="repr", profiler=None):
+    """
+    Runs the compile pipeline and returns (payload, stats), with the same
+    arguments as compile_stages.
+    """
+    result = {}
+    javascript = []
+    for artifact, value in compile_stages(
+        code, minify, mangle, optimize_loops, artifacts, budget, token_format, profiler
+    ):
+        if artifact == "javascript":
+            javascript.append(value)
+        elif artifact == "stats":
+            stats = value
+        else:
+            result[artifact] = value
+    if "javascript" in artifacts:
+        result["javascript"] = "".join(javascript)
+    return result, stats
+
+
+def compile_payload(code, minify=False, mangle=False, optimize_loops=False, artifacts=ARTIFACTS,
+                    budget=None, token_format="repr"):
+    """
+    Runs the compile pipeline and returns only the /compile response payload.
+    """
+    return compile_with_metrics(code, minify, mangle, optimize_loops, artifacts, budget, token_format)[0]
+
+
+def compile_batch(items, minify=False, mangle=False, optimize_loops=False, artifacts=ARTIFACTS, budget=None,
+                  token_format="repr"):
+    """
+    Compiles a list of (index, code) pairs and returns one
+    (index, status, value, stats) tuple per program: status 200 with the
+    payload and its stats, or the HTTP error status with its message. A
+    failing program never affects the others. Runs as a single task on a
+    pool worker, so one round trip carries many programs.
+
+    stats is None for errors that should not be cached (deadline overruns
+    depend on load, not on the program) and {} for every other error.
+    """
+    results = []
+    for index, code in items:
+        try:
+            payload, stats = compile_with_metrics(
+                code, minify, mangle, optimize_loops, artifacts, budget, token_format
+            )
+            results.append((index, 200, payload, stats))
+        except CompileLimitExceeded as e:
+            results.append((index, e.status_code, str(e), None if e.limit == "deadline" else {}))
+        except Exception as e:
+            results.append((index, 400, format_error_message(e, code), {}))
+    return results
+
+
+def warm_up():
+    """
+    Compiles WARMUP_PROGRAM with every option and artifact, plus a broken
+    program, so the first real request in this process does not pay for
+    first-use costs (lazily built caches, regex compilation, loading the
+    optional code paths). Returns the seconds it took.
+    """
+    start = perf_counter()
+    # A few hundred lines also grow the allocator's memory pools to the size
+    # a real program needs; after a tiny program the first large compile
+    # still ran 10-25% slower than the next one
+    compile_with_metrics("".join(
+        WARMUP_PROGRAM.replace("scale", f"scale{copy}") for copy in range(WARMUP_COPIES)
+    ))
+    for minify, mangle, optimize_loops in ((False, False, False), (True, True, True)):
+        compile_with_metrics(WARMUP_PROGRAM, minify, mangle, optimize_loops)
+    compile_with_metrics(WARMUP_PROGRAM, token_format="columnar")
+    try:
+        compile_with_metrics("x = (1 +\n")
+    except Exception as e:
+        format_error_message(e, "x = (1 +\n")
+    return perf_counter() - start
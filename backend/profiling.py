@@ -0,0 +1,138 @@
+# profiling.py
+
+import cProfile
+import json
+import os
+import pstats
+import time
+import uuid
+
+from pipeline import compile_with_metrics
+
+# Funciones cuya cantidad de llamadas se informa por etapa, como
+# (archivo, nombre); los métodos homónimos de distintas clases se suman
+COUNTED_FUNCTIONS = {
+    ("lexer.py", "Lexer"): "Lexer",
+    ("parser.py", "match"): "Parser.match",
+    ("parser.py", "parse_statement"): "Parser.parse_statement",
+    ("parser.py", "parse_expression"): "Parser.parse_expression",
+    ("node_factory.py", "create"): "NodeFactory.create",
+    ("ast_nodes.py", "to_js"): "*.to_js",
+    ("ast_nodes.py", "to_tree"): "*.to_tree",
+    ("ast_nodes.py", "__str__"): "*.__str__",
+}
+# Funciones más costosas (por tiempo propio) que se listan en cada etapa
+TOP_FUNCTIONS = 15
+
+
+def _function_label(key):
+    filename, line, name = key
+    if filename == "~":  # funciones de C
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+class CompileProfiler:
+    """
+    Perfil determinista (cProfile) de una sola compilación, con un perfil
+    separado por etapa del pipeline (lex, parse, transpile...). Se pasa a
+    compile_stages, que llama a start/stop alrededor de cada etapa, y se
+    guarda en directory como <id>.prof (formato pstats, para snakeviz o
+    `python -m pstats`) más <id>.json con el resumen: duración, cantidad de
+    llamadas de COUNTED_FUNCTIONS y funciones más costosas de cada etapa.
+
+    max_profiles: cuántos perfiles se conservan; al guardar uno nuevo se
+    borran los más viejos
+    """
+    def __init__(self, directory, max_profiles):
+        self.id = uuid.uuid4().hex
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self.profiles = {}
+        self.current = None
+
+    def start(self, stage):
+        profile = self.profiles.get(stage)
+        if profile is None:
+            profile = self.profiles[stage] = cProfile.Profile()
+        self.current = profile
+        profile.enable()
+
+    def stop(self):
+        self.current.disable()
+        self.current = None
+
+    def compile(self, code, *args):
+        """
+        Corre compile_with_metrics(code, *args) bajo el profiler y guarda el
+        perfil aunque la compilación falle. Pensado para un hilo aparte:
+        cProfile sólo registra el hilo que lo activa.
+        """
+        started = time.time()
+        error = None
+        stats = None
+        try:
+            result, stats = compile_with_metrics(code, *args, profiler=self)
+            return result, stats
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if self.current is not None:
+                # La etapa que falló nunca llegó a su stop()
+                self.stop()
+            self.save({
+                "id": self.id,
+                "created": started,
+                "source_bytes": len(code.encode("utf-8")),
+                "stages": stats["stages"] if stats is not None else None,
+                "error": error,
+            })
+
+    def summary(self):
+        stages = {}
+        for stage, profile in self.profiles.items():
+            entries = pstats.Stats(profile).stats
+            counts = dict.fromkeys(COUNTED_FUNCTIONS.values(), 0)
+            total_calls = 0
+            for (filename, _, name), (_, calls, _, _, _) in entries.items():
+                total_calls += calls
+                label = COUNTED_FUNCTIONS.get((os.path.basename(filename), name))
+                if label is not None:
+                    counts[label] += calls
+            top = sorted(entries.items(), key=lambda item: item[1][2], reverse=True)[:TOP_FUNCTIONS]
+            stages[stage] = {
+                "calls": total_calls,
+                "counts": {label: count for label, count in counts.items() if count},
+                "top": [
+                    {"function": _function_label(key), "calls": calls,
+                     "own_seconds": own, "total_seconds": total}
+                    for key, (_, calls, own, total, _) in top
+                ],
+            }
+        return stages
+
+    def save(self, info):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, self.id)
+        if self.profiles:
+            combined = pstats.Stats(*self.profiles.values())
+            combined.dump_stats(base + ".prof")
+        with open(base + ".json", "w", encoding="utf-8") as file:
+            json.dump({**info, "profile": self.summary()}, file, indent=2)
+        self.prune()
+
+    def prune(self):
+        """Borra los perfiles más viejos hasta dejar max_profiles."""
+        summaries = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    summaries.append((entry.stat().st_mtime_ns, entry.name[:-len(".json")]))
+        summaries.sort()
+        for _, profile_id in summaries[:max(0, len(summaries) - self.max_profiles)]:
+            for suffix in (".json", ".prof"):
+                try:
+                    os.unlink(os.path.join(self.directory, profile_id + suffix))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,211 @@
+# pybackend.py
+
+import ast
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from ast_nodes import (
+    NumberNode, StringNode, BooleanNode, IdentifierNode,
+    BinOpNode, AssignNode, PrintNode, IfNode, WhileNode, BlockNode,
+    ForNode, RangeNode, FunctionDefNode, FunctionCallNode, ReturnNode
+)
+from lexer import Lexer
+from parser import Parser
+
+# Operadores de MiniPython -> nodos del módulo ast de Python
+ARITH_OPERATORS = {
+    'PLUS': ast.Add,
+    'MINUS': ast.Sub,
+    'MULT': ast.Mult,
+    'DIV': ast.Div,
+}
+COMPARE_OPERATORS = {
+    'GT': ast.Gt,
+    'LT': ast.Lt,
+    'EQ': ast.Eq,
+    'NEQ': ast.NotEq,
+    'GTE': ast.GtE,
+    'LTE': ast.LtE,
+}
+
+# Los identificadores de MiniPython siempre empiezan con una letra, así que
+# los nombres que inyectamos (con '_' al inicio) nunca chocan con los del usuario.
+PRINT_NAME = "_print"
+TICK_NAME = "_tick"
+
+# Únicos builtins visibles para el programa
+SAFE_BUILTINS = {"range": range}
+
+# Cantidad máxima de code objects guardados en la caché
+CODE_CACHE_SIZE = 256
+
+
+class ExecutionTimeout(RuntimeError):
+    """El programa superó su tiempo máximo de ejecución."""
+
+
+class PyCompiler:
+    """
+    Traduce el AST de MiniPython al módulo ast de Python y lo compila con
+    compile() a un code object real.
+
+    Al inicio de cada iteración de while/for y de cada función se inserta una
+    llamada a _tick() para que execute() pueda cortar programas que no terminan.
+    """
+    def __init__(self, ast_root: BlockNode):
+        self.ast_root = ast_root
+
+    def compile(self):
+        module = ast.Module(body=self.lower_body(self.ast_root.statements), type_ignores=[])
+        ast.fix_missing_locations(module)
+        return compile(module, "<minipython>", "exec")
+
+    def lower_body(self, statements):
+        body = [self.lower_statement(stmt) for stmt in statements]
+        return body or [ast.Pass()]
+
+    def tick(self):
+        return ast.Expr(ast.Call(ast.Name(TICK_NAME, ast.Load()), [], []))
+
+    # Sentencias -----------------------------------------------------------
+
+    def lower_statement(self, node):
+        if isinstance(node, AssignNode):
+            if not isinstance(node.target, IdentifierNode):
+                raise SyntaxError(f"Cannot assign to {node.target}")
+            return ast.Assign(
+                targets=[ast.Name(node.target.name, ast.Store())],
+                value=self.lower_expression(node.value)
+            )
+        if isinstance(node, PrintNode):
+            return ast.Expr(ast.Call(
+                ast.Name(PRINT_NAME, ast.Load()), [self.lower_expression(node.value)], []
+            ))
+        if isinstance(node, IfNode):
+            return ast.If(
+                test=self.lower_expression(node.condition),
+                body=self.lower_body(node.body),
+                orelse=self.lower_body(node.else_body) if node.else_body is not None else []
+            )
+        if isinstance(node, WhileNode):
+            return ast.While(
+                test=self.lower_expression(node.condition),
+                body=[self.tick()] + self.lower_body(node.body),
+                orelse=[]
+            )
+        if isinstance(node, ForNode):
+            if not isinstance(node.iterable, RangeNode):
+                raise NotImplementedError("Only range() is supported in for loops")
+            return ast.For(
+                target=ast.Name(node.variable.name, ast.Store()),
+                iter=self.lower_range(node.iterable),
+                body=[self.tick()] + self.lower_body(node.body),
+                orelse=[]
+            )
+        if isinstance(node, FunctionDefNode):
+            return ast.FunctionDef(
+                name=node.name,
+                args=ast.arguments(
+                    posonlyargs=[],
+                    args=[ast.arg(param.name) for param in node.params],
+                    kwonlyargs=[], kw_defaults=[], defaults=[]
+                ),
+                body=[self.tick()] + self.lower_body(node.body),
+                decorator_list=[]
+            )
+        if isinstance(node, ReturnNode):
+            value = self.lower_expression(node.value) if node.value is not None else None
+            return ast.Return(value)
+        if isinstance(node, BlockNode):
+            return ast.If(test=ast.Constant(True), body=self.lower_body(node.statements), orelse=[])
+        # Expresión usada como sentencia (p.ej. una llamada suelta)
+        return ast.Expr(self.lower_expression(node))
+
+    # Expresiones ----------------------------------------------------------
+
+    def lower_range(self, node):
+        args = [self.lower_expression(arg) for arg in (node.start, node.stop, node.step)]
+        return ast.Call(ast.Name("range", ast.Load()), args, [])
+
+    def lower_expression(self, node):
+        if isinstance(node, (NumberNode, StringNode)):
+            return ast.Constant(node.value)
+        if isinstance(node, BooleanNode):
+            return ast.Constant(node.value in (True, "True"))
+        if isinstance(node, IdentifierNode):
+            return ast.Name(node.name, ast.Load())
+        if isinstance(node, BinOpNode):
+            left = self.lower_expression(node.left)
+            right = self.lower_expression(node.right)
+            if node.op in ARITH_OPERATORS:
+                return ast.BinOp(left, ARITH_OPERATORS[node.op](), right)
+            if node.op in COMPARE_OPERATORS:
+                return ast.Compare(left, [COMPARE_OPERATORS[node.op]()], [right])
+            raise NotImplementedError(f"Unsupported operator {node.op}")
+        if isinstance(node, FunctionCallNode):
+            name = node.name if isinstance(node.name, str) else node.name.name
+            args = [self.lower_expression(arg) for arg in node.args]
+            return ast.Call(ast.Name(name, ast.Load()), args, [])
+        raise NotImplementedError(f"Cannot compile {node.__class__.__name__}")
+
+
+_code_cache = OrderedDict()
+# /run compila en hilos del servidor
+_code_cache_lock = threading.Lock()
+
+
+def compile_source(code, budget=None):
+    """
+    Compila código MiniPython a un code object de Python, con los límites de
+    budget (ya iniciado) si se da uno.
+    Los resultados se guardan en una caché LRU indexada por el hash del código.
+    """
+    key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+    with _code_cache_lock:
+        if key in _code_cache:
+            _code_cache.move_to_end(key)
+            return _code_cache[key]
+
+    ast_root = Parser(Lexer(code, budget), budget).parse()
+    if budget is not None:
+        # PyCompiler y compile() son recursivos
+        budget.check_tree(ast_root)
+    code_obj = PyCompiler(ast_root).compile()
+
+    with _code_cache_lock:
+        _code_cache[key] = code_obj
+        if len(_code_cache) > CODE_CACHE_SIZE:
+            _code_cache.popitem(last=False)
+    return code_obj
+
+
+def execute(code_obj, timeout=1.0):
+    """
+    Ejecuta un code object generado por PyCompiler en un entorno aislado
+    (sólo los builtins de SAFE_BUILTINS) y devuelve las líneas impresas.
+    Lanza ExecutionTimeout si el programa tarda más de timeout segundos.
+    """
+    output = []
+    deadline = time.perf_counter() + timeout
+    clock = time.perf_counter
+
+    def tick():
+        if clock() > deadline:
+            raise ExecutionTimeout(f"Execution time limit of {timeout} seconds exceeded")
+
+    sandbox = {
+        "__builtins__": SAFE_BUILTINS,
+        PRINT_NAME: lambda value: output.append(str(value)),
+        TICK_NAME: tick,
+    }
+    exec(code_obj, sandbox)
+    return output
+
+
+def run_source(code, timeout=1.0):
+    """
+    Función de conveniencia: compila (usando la caché) y ejecuta el código.
+    """
+    return execute(compile_source(code), timeout=timeout)
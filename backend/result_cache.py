@@ -0,0 +1,112 @@
+# result_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_key(code, *options):
+    """
+    Clave de caché: hash del código fuente más las opciones que cambian la
+    respuesta (p.ej. minify), para no mezclar resultados distintos.
+    """
+    digest = hashlib.sha256(code.encode("utf-8"))
+    for option in options:
+        digest.update(b"\0" + repr(option).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def payload_size(value):
+    """Tamaño aproximado en bytes de una respuesta (strings, listas y dicts)."""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(len(key) + payload_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    return 8
+
+
+class ResultCache:
+    """
+    Caché LRU en memoria de respuestas completas.
+
+    max_entries: cantidad máxima de entradas
+    max_bytes: tamaño total máximo (según payload_size)
+    ttl: segundos que vive cada entrada (None = sin vencimiento)
+
+    Los errores también se guardan (caché negativa) para no recompilar una y
+    otra vez el mismo programa inválido.
+    """
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (is_error, value, size, expires)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Devuelve (is_error, value) o None si la clave no está en caché."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            is_error, value, size, expires = entry
+            if expires is not None and time.monotonic() > expires:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return is_error, value
+
+    def put(self, key, value, is_error=False, size=None):
+        """size: tamaño en bytes si value no es una respuesta JSON (por defecto payload_size)."""
+        if size is None:
+            size = payload_size(value)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (is_error, value, size, expires)
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.total_bytes -= entry[2]
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,126 @@
+# sandbox.py
+
+import marshal
+import multiprocessing
+import os
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from lexer import Lexer
+from parser import Parser
+from bytecode import compile_program
+from vm import VM
+from pybackend import ExecutionTimeout, compile_source, execute
+
+# El servidor tiene hilos (el event loop, el executor, el pool), y hacer fork
+# de un proceso con hilos puede dejar al hijo bloqueado en un lock que otro
+# hilo tenía tomado. Los hijos salen de un forkserver: un proceso aparte, sin
+# hilos, que ya importó este módulo, así que crear cada hijo sigue siendo barato
+FORKSERVER = "forkserver" in multiprocessing.get_all_start_methods()
+if FORKSERVER:
+    _context = multiprocessing.get_context("forkserver")
+    _context.set_forkserver_preload([__name__])
+
+
+class ExecutionKilled(RuntimeError):
+    """El proceso que ejecutaba el programa terminó sin dar un resultado."""
+
+
+def _limit_memory(max_bytes):
+    """Limita el espacio de direcciones del proceso a lo que ya usa más max_bytes."""
+    if resource is None or max_bytes is None:
+        return
+    try:
+        with open("/proc/self/statm") as statm:
+            current = int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return
+    resource.setrlimit(resource.RLIMIT_AS, (current + max_bytes, resource.RLIM_INFINITY))
+
+
+def _child(connection, run, args, max_memory):
+    try:
+        _limit_memory(max_memory)
+        result = (False, run(*args))
+    except MemoryError:
+        result = (True, MemoryError(f"Execution memory limit of {max_memory} bytes exceeded"))
+    except Exception as e:
+        result = (True, e)
+    try:
+        connection.send(result)
+    except Exception as e:
+        # La excepción no se pudo serializar
+        connection.send((True, RuntimeError(f"{type(result[1]).__name__}: {result[1]}")))
+    finally:
+        connection.close()
+
+
+def run_isolated(run, args, wall_seconds, max_memory=None):
+    """
+    Ejecuta run(*args) en un proceso hijo y devuelve su resultado o relanza
+    su excepción; run debe ser una función de módulo y args serializables
+    con pickle. El hijo se mata si no termina en wall_seconds (aunque esté en
+    medio de una sola operación larga, como elevar al cuadrado un entero
+    enorme) y no puede reservar más de max_memory bytes por encima de lo que
+    ocupa al empezar. Sin forkserver (Windows) run se ejecuta en este hilo y
+    sólo valen los límites propios de cada motor.
+    """
+    if not FORKSERVER:
+        return run(*args)
+    receiver, sender = _context.Pipe(duplex=False)
+    process = _context.Process(target=_child, args=(sender, run, args, max_memory), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(wall_seconds):
+            raise ExecutionTimeout(f"Execution time limit of {wall_seconds} seconds exceeded")
+        try:
+            is_error, value = receiver.recv()
+        except EOFError:
+            raise ExecutionKilled("Execution was terminated before producing a result") from None
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.kill()
+        process.join()
+    if is_error:
+        raise value
+    return value
+
+
+def _run_python(code_bytes, timeout):
+    # Los code objects no se pueden serializar con pickle, pero sí con marshal
+    return {"output": execute(marshal.loads(code_bytes), timeout=timeout)}
+
+
+def _run_vm(module, max_steps):
+    vm = VM(max_steps=max_steps)
+    output = vm.run(module)
+    return {"output": output, "steps": vm.steps}
+
+
+def run_program(code, engine="vm", budget=None, max_steps=1_000_000, timeout=1.0,
+                wall_seconds=None, max_memory=None):
+    """
+    Compila code en este proceso, con los límites de budget como /compile, y
+    lo ejecuta aislado con run_isolated. engine "vm" usa la VM de bytecode
+    con max_steps instrucciones; "python" usa pybackend con timeout
+    segundos. Devuelve {"output": líneas} más "steps" en la VM.
+    """
+    if budget is not None:
+        budget = budget.start()
+    if wall_seconds is None:
+        wall_seconds = timeout
+
+    if engine == "python":
+        code_bytes = marshal.dumps(compile_source(code, budget))
+        return run_isolated(_run_python, (code_bytes, timeout), wall_seconds, max_memory)
+
+    ast = Parser(Lexer(code, budget), budget).parse()
+    if budget is not None:
+        budget.check_tree(ast)
+    module = compile_program(ast)
+    return run_isolated(_run_vm, (module, max_steps), wall_seconds, max_memory)
@@ -0,0 +1,396 @@
+# symbols.py
+
+from lexer import Lexer
+from parser import Parser
+from result_cache import ResultCache, make_key
+from ast_nodes import (
+    IdentifierNode, BinOpNode, AssignNode, PrintNode, IfNode, WhileNode,
+    ForNode, FunctionDefNode, FunctionCallNode, ReturnNode, function_locals
+)
+from budgets import CompileLimitExceeded
+
+MODULE_SCOPE = "<module>"
+
+# Bytes aproximados que ocupa cada aparición de un nombre y cada símbolo
+# (medidos con tracemalloc), para acotar las cachés por memoria
+UNIT_SITE_BYTES = 100
+INDEX_SITE_BYTES = 240
+SYMBOL_BYTES = 250
+
+
+class Symbol:
+    """
+    Una función, parámetro o variable con su scope.
+
+    scope: MODULE_SCOPE o el camino de la función que lo declara ("f", "f.g")
+    definitions: (línea, columna) de cada asignación o declaración, en orden
+    references: (línea, columna) de cada uso
+    params: nombres de los parámetros (sólo funciones)
+
+    Las columnas empiezan en 1. Un símbolo sin definiciones es un nombre
+    usado pero nunca asignado (kind "undefined").
+    """
+    __slots__ = ("id", "name", "kind", "scope", "definitions", "references", "params")
+
+    def __init__(self, name, kind, scope, params=None):
+        self.id = None
+        self.name = name
+        self.kind = kind
+        self.scope = scope
+        self.definitions = []
+        self.references = []
+        self.params = params
+
+    def shifted(self, offset):
+        """Copia con las líneas desplazadas offset lugares."""
+        symbol = Symbol(self.name, self.kind, self.scope, self.params)
+        symbol.definitions = [(line + offset, column) for line, column in self.definitions]
+        symbol.references = [(line + offset, column) for line, column in self.references]
+        return symbol
+
+    def to_dict(self):
+        def position(site):
+            return {"line": site[0], "column": site[1]}
+        result = {
+            "id": self.id,
+            "name": self.name,
+            "kind": self.kind,
+            "scope": self.scope,
+            "definition": position(self.definitions[0]) if self.definitions else None,
+            "definitions": [position(site) for site in self.definitions],
+            "references": [position(site) for site in self.references],
+        }
+        if self.params is not None:
+            result["params"] = self.params
+        return result
+
+
+def split_units(code):
+    """
+    Divide el programa en unidades que se pueden analizar por separado: cada
+    línea que empieza en la columna 0 abre una unidad que sigue hasta la
+    próxima, salvo un else, que pertenece al if anterior. Sigue las mismas
+    reglas que el lexer (los comentarios no cuentan, sólo los espacios
+    indentan), así que cada unidad produce las mismas sentencias que dentro
+    del programa completo. Devuelve [(desplazamiento de líneas, texto)].
+    """
+    lines = code.split("\n")
+    starts = [0]
+    for number, line in enumerate(lines):
+        comment_index = line.find("#")
+        content = line[:comment_index] if comment_index != -1 else line
+        if not content.strip() or content[0] == " ":
+            continue
+        word = content.split(None, 1)[0]
+        if word == "else" or word.startswith("else:"):
+            continue
+        if number != starts[-1]:
+            starts.append(number)
+    starts.append(len(lines))
+    return [
+        (start, "\n".join(lines[start:end]))
+        for start, end in zip(starts, starts[1:])
+    ]
+
+
+def identifier_positions(text, tokens):
+    """
+    (línea, columna) de cada token ID, en orden. El lexer sólo descarta
+    espacios entre tokens, así que cada token empieza en el primer carácter
+    no blanco después del anterior.
+    """
+    lines = text.split("\n")
+    positions = []
+    current_line = None
+    line_text = ""
+    cursor = 0
+    for kind, value, line in tokens:
+        if kind in ("INDENT", "DEDENT", "EOF"):
+            continue
+        if line != current_line:
+            current_line = line
+            line_text = lines[line - 1]
+            cursor = 0
+        while line_text[cursor].isspace():
+            cursor += 1
+        if kind == "ID":
+            positions.append((line, cursor + 1))
+        # Los strings se guardan sin sus comillas
+        cursor += len(value) + 2 if kind == "STRING" else len(value)
+    return positions
+
+
+class UnitSymbols:
+    """
+    Resultado del análisis de una unidad, con líneas relativas a la unidad:
+
+    local_symbols: símbolos declarados dentro de funciones de la unidad
+    module_sites: [(nombre, línea, columna, kind, params)] de los nombres que
+        se resuelven en el scope del módulo; kind es "function" o "variable"
+        si el sitio los define y None si es un uso
+    tokens / nodes: cuántos produjo la unidad, para los límites del programa
+    """
+    def __init__(self):
+        self.local_symbols = []
+        self.module_sites = []
+        self.tokens = 0
+        self.nodes = 0
+
+    def memory_bytes(self):
+        sites = len(self.module_sites) + sum(
+            len(symbol.definitions) + len(symbol.references) for symbol in self.local_symbols
+        )
+        return sites * UNIT_SITE_BYTES + len(self.local_symbols) * SYMBOL_BYTES
+
+
+class _UnitAnalyzer:
+    """
+    Recorre el AST de una unidad en el orden del código fuente, que es el
+    orden de sus tokens ID, y asigna cada nombre a su símbolo. Un nombre
+    pertenece a la función más interna que lo declara (function_locals,
+    como al transpilar) o, si ninguna lo hace, al módulo.
+    """
+    def __init__(self, positions):
+        self.positions = iter(positions)
+        self.result = UnitSymbols()
+
+    def site(self, name, frames, kind=None, params=None):
+        position = next(self.positions)
+        for path, local_symbols in reversed(frames):
+            symbol = local_symbols.get(name)
+            if symbol is not None:
+                if kind is not None:
+                    symbol.definitions.append(position)
+                    if kind == "function":
+                        symbol.kind = "function"
+                        symbol.params = params
+                else:
+                    symbol.references.append(position)
+                return
+        self.result.module_sites.append((name, position[0], position[1], kind, params))
+
+    def statements(self, statements, frames):
+        for stmt in statements:
+            self.statement(stmt, frames)
+
+    def statement(self, node, frames):
+        if isinstance(node, FunctionDefNode):
+            params = [param.name for param in node.params if isinstance(param, IdentifierNode)]
+            self.site(node.name, frames, "function", params)
+            path = f"{frames[-1][0]}.{node.name}" if frames else node.name
+            local_symbols = {}
+            for name in function_locals(node):
+                symbol = Symbol(name, "parameter" if name in params else "variable", path)
+                local_symbols[name] = symbol
+                self.result.local_symbols.append(symbol)
+            inner = frames + [(path, local_symbols)]
+            for param in node.params:
+                self.name(param, inner, "parameter")
+            self.statements(node.body, inner)
+        elif isinstance(node, AssignNode):
+            self.name(node.target, frames, "variable")
+            self.expression(node.value, frames)
+        elif isinstance(node, ForNode):
+            self.name(node.variable, frames, "variable")
+            # range(stop) lleva un start sintético, pero es un NumberNode
+            # sin tokens ID, así que no altera el orden
+            for part in (node.iterable.start, node.iterable.stop, node.iterable.step):
+                self.expression(part, frames)
+            self.statements(node.body, frames)
+        elif isinstance(node, IfNode):
+            self.expression(node.condition, frames)
+            self.statements(node.body, frames)
+            self.statements(node.else_body or [], frames)
+        elif isinstance(node, WhileNode):
+            self.expression(node.condition, frames)
+            self.statements(node.body, frames)
+        elif isinstance(node, (PrintNode, ReturnNode)):
+            if node.value is not None:
+                self.expression(node.value, frames)
+        else:
+            self.expression(node, frames)
+
+    def name(self, node, frames, kind):
+        if isinstance(node, IdentifierNode):
+            self.site(node.name, frames, kind)
+
+    def expression(self, node, frames):
+        if isinstance(node, IdentifierNode):
+            self.site(node.name, frames)
+        elif isinstance(node, BinOpNode):
+            self.expression(node.left, frames)
+            self.expression(node.right, frames)
+        elif isinstance(node, FunctionCallNode):
+            if isinstance(node.name, str):
+                self.site(node.name, frames)
+            else:
+                self.expression(node.name, frames)
+            for arg in node.args:
+                self.expression(arg, frames)
+
+
+def analyze_unit(text, budget=None):
+    """Lexea, parsea y analiza una unidad; las excepciones de sintaxis se propagan."""
+    tokens = Lexer(text, budget)
+    parser = Parser(tokens, budget)
+    ast = parser.parse()
+    if budget is not None:
+        # El análisis es recursivo, como los emisores
+        budget.check_tree(ast)
+    analyzer = _UnitAnalyzer(identifier_positions(text, tokens))
+    analyzer.statements(ast.statements, [])
+    analyzer.result.tokens = len(tokens) - 1  # sin el EOF
+    analyzer.result.nodes = parser.node_count
+    return analyzer.result
+
+
+class SymbolIndex:
+    """
+    Tabla de símbolos de un programa completo. Las consultas son búsquedas
+    en diccionarios:
+
+    symbol_at(línea, columna): el símbolo de cualquier carácter de un nombre;
+        se recorren sólo los nombres de esa línea, que son pocos
+    functions_named(nombre): las funciones con ese nombre, anidadas incluidas
+    """
+    def __init__(self, index_id, units):
+        self.id = index_id
+        self.symbols = []
+        self.lines = {}
+        self.functions = {}
+        module_symbols = {}
+        module_sites = []
+
+        for offset, unit in units:
+            for symbol in unit.local_symbols:
+                self.add(symbol.shifted(offset))
+            module_sites.extend(
+                (name, line + offset, column, kind, params)
+                for name, line, column, kind, params in unit.module_sites
+            )
+
+        # Primero todas las definiciones: un uso puede aparecer antes que la
+        # asignación (p.ej. una función que lee una global definida después)
+        for name, line, column, kind, params in module_sites:
+            if kind is None:
+                continue
+            symbol = module_symbols.get(name)
+            if symbol is None:
+                symbol = module_symbols[name] = Symbol(name, kind, MODULE_SCOPE)
+            if kind == "function":
+                symbol.kind = "function"
+                symbol.params = params
+            symbol.definitions.append((line, column))
+        for name, line, column, kind, params in module_sites:
+            if kind is not None:
+                continue
+            symbol = module_symbols.get(name)
+            if symbol is None:
+                symbol = module_symbols[name] = Symbol(name, "undefined", MODULE_SCOPE)
+            symbol.references.append((line, column))
+        for symbol in module_symbols.values():
+            self.add(symbol)
+
+    def add(self, symbol):
+        symbol.id = len(self.symbols)
+        self.symbols.append(symbol)
+        end = len(symbol.name)
+        for line, column in symbol.definitions + symbol.references:
+            self.lines.setdefault(line, []).append((column, column + end, symbol.id))
+        if symbol.kind == "function":
+            self.functions.setdefault(symbol.name, []).append(symbol.id)
+
+    def memory_bytes(self):
+        sites = sum(len(symbol.definitions) + len(symbol.references) for symbol in self.symbols)
+        return sites * INDEX_SITE_BYTES + len(self.symbols) * SYMBOL_BYTES
+
+    def symbol_at(self, line, column):
+        for start, end, symbol_id in self.lines.get(line, ()):
+            if start <= column < end:
+                return self.symbols[symbol_id]
+        return None
+
+    def functions_named(self, name):
+        return [self.symbols[symbol_id] for symbol_id in self.functions.get(name, ())]
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "symbols": len(self.symbols),
+            "functions": [
+                {"name": symbol.name, "scope": symbol.scope, "params": symbol.params,
+                 "line": symbol.definitions[0][0] if symbol.definitions else None}
+                for symbol in self.symbols if symbol.kind == "function"
+            ],
+        }
+
+
+class SymbolIndexer:
+    """
+    Construye índices de símbolos con dos niveles de caché:
+
+    indexes: índice completo por hash del código, para que las consultas
+             posteriores lo encuentren por su id
+    units: análisis de cada unidad de nivel superior por hash de su texto;
+           al editar una función sólo se vuelve a parsear esa unidad, y el
+           índice nuevo se arma con las demás tal como estaban
+
+    max_indexes / max_units: entradas máximas de cada caché (LRU)
+    max_index_bytes / max_unit_bytes: memoria máxima de cada caché, según
+        memory_bytes() de lo guardado
+    """
+    def __init__(self, max_indexes=64, max_units=4096, max_index_bytes=128 * 1024 * 1024,
+                 max_unit_bytes=64 * 1024 * 1024):
+        self.indexes = ResultCache(max_entries=max_indexes, max_bytes=max_index_bytes)
+        self.units = ResultCache(max_entries=max_units, max_bytes=max_unit_bytes)
+
+    def get(self, index_id):
+        cached = self.indexes.get(index_id)
+        return cached[1] if cached is not None else None
+
+    def index(self, code, budget=None):
+        """
+        Devuelve (índice, unidades analizadas, unidades reutilizadas). Los
+        errores de sintaxis se lanzan igual que al compilar. Cada unidad se
+        lexea y parsea por separado, así que los límites de tokens y nodos
+        se comprueban además sobre la suma de todas, reutilizadas incluidas.
+        """
+        index_id = make_key(code)
+        cached = self.indexes.get(index_id)
+        if cached is not None:
+            return cached[1], 0, 0
+        if budget is not None:
+            budget = budget.start()
+            budget.check_source(code)
+
+        units = []
+        analyzed = reused = 0
+        tokens = nodes = 0
+        try:
+            for offset, text in split_units(code):
+                key = make_key(text)
+                hit = self.units.get(key)
+                if hit is not None:
+                    unit = hit[1]
+                    reused += 1
+                else:
+                    unit = analyze_unit(text, budget)
+                    self.units.put(key, unit, size=unit.memory_bytes())
+                    analyzed += 1
+                units.append((offset, unit))
+                if budget is not None:
+                    tokens += unit.tokens
+                    nodes += unit.nodes
+                    budget.check_tokens(tokens, offset + text.count("\n") + 1)
+                    budget.check_nodes(nodes)
+        except CompileLimitExceeded:
+            raise
+        except Exception:
+            # El programa completo da el mensaje con la línea absoluta (y
+            # cubre cualquier caso en que las unidades no lo reproduzcan)
+            units = [(0, analyze_unit(code, budget))]
+            analyzed, reused = 1, 0
+
+        index = SymbolIndex(index_id, units)
+        self.indexes.put(index_id, index, size=index.memory_bytes())
+        return index, analyzed, reused
@@ -1,24 +1,63 @@
 # transpiler.py
 
 from ast_nodes import ASTNode, BlockNode
+from loop_idioms import closed_form_js
 
 class Transpiler:
     """
     Transpilador de nuestro mini-Python a JavaScript.
     Recibe el AST y usa los métodos to_js() de cada nodo.
+
+    minify: emite código compacto (sin indentación ni saltos de línea y con
+            paréntesis sólo donde la precedencia lo requiere).
+    mangle: acorta los nombres de parámetros y variables locales dentro de
+            cada función.
+    optimize_loops: reemplaza los bucles for que sólo acumulan valores por
+            su forma cerrada (ver loop_idioms.py).
+    budget: CompileBudget opcional; limita el tamaño de la salida y el tiempo.
     """
-    def __init__(self, ast_root: ASTNode):
+    def __init__(self, ast_root: ASTNode, minify: bool = False, mangle: bool = False,
+                 optimize_loops: bool = False, budget=None):
         self.ast_root = ast_root
+        self.minify = minify
+        self.mangle = mangle
+        self.optimize_loops = optimize_loops
+        self.budget = budget
 
     def transpile(self) -> str:
         # El AST raíz es un BlockNode con la lista de statements
+        return self.ast_root.to_js(indent=0, context=self.new_context())
+
+    def transpile_chunks(self):
+        """
+        Igual que transpile(), pero genera el código de a una sentencia de
+        primer nivel por vez; concatenar los fragmentos da el mismo resultado.
+        """
+        context = self.new_context()
+        separator = "" if self.minify else "\n"
+        for position, stmt in enumerate(self.ast_root.statements):
+            # Un bloque de una sola sentencia agrega el ';' del modo compacto
+            js = BlockNode([stmt]).to_js(0, context)
+            yield js if position == 0 else separator + js
+
+    def new_context(self):
+        """Contexto inicial de to_js según las opciones del transpilador."""
         context = {"declared_vars": set()}
-        return self.ast_root.to_js(indent=0, context=context)
+        if self.minify:
+            context["minify"] = True
+        if self.mangle:
+            context["mangle"] = True
+        if self.optimize_loops:
+            context["loop_rewriter"] = closed_form_js
+        if self.budget is not None:
+            context["budget"] = self.budget
+        return context
 
 
-def transpile(ast_root: ASTNode) -> str:
+def transpile(ast_root: ASTNode, minify: bool = False, mangle: bool = False,
+              optimize_loops: bool = False) -> str:
     """
     Función de conveniencia, por si prefieres no usar la clase.
     """
-    t = Transpiler(ast_root)
+    t = Transpiler(ast_root, minify=minify, mangle=mangle, optimize_loops=optimize_loops)
     return t.transpile()
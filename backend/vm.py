@@ -0,0 +1,250 @@
+# vm.py
+
+import sys
+
+from bytecode import (
+    LOAD_CONST, LOAD_GLOBAL, STORE_GLOBAL, LOAD_FAST, STORE_FAST, LOAD_FREE,
+    BINARY_ADD, BINARY_SUB, BINARY_MUL, BINARY_DIV,
+    COMPARE_GT, COMPARE_LT, COMPARE_EQ, COMPARE_NEQ, COMPARE_GTE, COMPARE_LTE,
+    JUMP, POP_JUMP_IF_FALSE, GET_RANGE_ITER, FOR_ITER, PRINT, POP_TOP,
+    MAKE_FUNCTION, CALL, RETURN_VALUE, compile_program
+)
+
+# Marca de un slot local que todavía no tiene valor
+UNBOUND = object()
+
+
+class BudgetExceeded(RuntimeError):
+    """
+    El programa superó uno de los límites de la VM: instrucciones, tamaño
+    de un valor o tamaño de la salida.
+    """
+
+
+class Function:
+    __slots__ = ("code", "closure")
+
+    def __init__(self, code, closure):
+        self.code = code
+        # closure[d - 1] son los slots locales de la función exterior d
+        self.closure = closure
+
+    def __repr__(self):
+        return f"<function {self.code.name}>"
+
+
+class VM:
+    """
+    Máquina virtual de pila que ejecuta el bytecode de bytecode.py.
+
+    max_steps: número máximo de instrucciones a ejecutar (None = sin límite)
+    max_depth: profundidad máxima de llamadas anidadas
+    max_string_length: caracteres máximos de un string producido por + o *
+    max_int_bits: bits máximos de un entero producido por * (+ y - agregan a
+                  lo sumo un bit por instrucción, así que max_steps los acota)
+    max_output_size: caracteres máximos de todo lo impreso
+    Lo que el programa imprime se acumula en self.output (una línea por print).
+
+    Los límites de tamaño acotan la memoria, que las instrucciones no acotan:
+    un string que se duplica en un bucle llega a 1 GB en unas 150.
+    """
+    def __init__(self, max_steps=1_000_000, max_depth=200, max_string_length=1_000_000,
+                 max_int_bits=65_536, max_output_size=10_000_000):
+        self.max_steps = max_steps
+        self.max_depth = max_depth
+        self.max_string_length = max_string_length
+        self.max_int_bits = max_int_bits
+        self.max_output_size = max_output_size
+        self.globals = {}
+        self.output = []
+        self.output_size = 0
+        self.steps = 0
+
+    def value_too_large(self, value):
+        if value.__class__ is str:
+            return BudgetExceeded(f"String longer than {self.max_string_length} characters")
+        return BudgetExceeded(f"Integer larger than {self.max_int_bits} bits")
+
+    def run(self, module):
+        """Ejecuta un CodeObject de módulo y devuelve las líneas impresas."""
+        max_steps = self.max_steps if self.max_steps is not None else sys.maxsize
+        budget = max_steps - self.steps
+        max_string = self.max_string_length if self.max_string_length is not None else sys.maxsize
+        # Los enteros válidos cumplen int_floor < valor < int_limit
+        int_limit = 1 << self.max_int_bits if self.max_int_bits is not None else float("inf")
+        int_floor = -int_limit
+        output_room = initial_room = (
+            self.max_output_size - self.output_size if self.max_output_size is not None else sys.maxsize
+        )
+        global_vars = self.globals
+        output = self.output
+        frames = []
+
+        code_obj = module
+        code = module.code
+        consts = module.consts
+        names = module.names
+        local_vars = []
+        closure = ()
+        stack = []
+        pc = 0
+
+        try:
+            while True:
+                budget -= 1
+                if budget < 0:
+                    raise BudgetExceeded(f"Step budget of {self.max_steps} instructions exceeded")
+                op = code[pc]
+                arg = code[pc + 1]
+                pc += 2
+
+                if op == LOAD_FAST:
+                    value = local_vars[arg]
+                    if value is UNBOUND:
+                        raise UnboundLocalError(
+                            f"local variable '{code_obj.varnames[arg]}' referenced before assignment"
+                        )
+                    stack.append(value)
+                elif op == LOAD_CONST:
+                    stack.append(consts[arg])
+                elif op == STORE_FAST:
+                    local_vars[arg] = stack.pop()
+                elif op == LOAD_GLOBAL:
+                    name = names[arg]
+                    if name not in global_vars:
+                        raise NameError(f"name '{name}' is not defined")
+                    stack.append(global_vars[name])
+                elif op == STORE_GLOBAL:
+                    global_vars[names[arg]] = stack.pop()
+                elif op == BINARY_ADD:
+                    right = stack.pop()
+                    # El resultado mide a lo sumo el doble del límite, así
+                    # que alcanza con comprobarlo después
+                    value = stack[-1] + right
+                    if value.__class__ is str and len(value) > max_string:
+                        raise self.value_too_large(value)
+                    stack[-1] = value
+                elif op == BINARY_SUB:
+                    right = stack.pop()
+                    stack[-1] = stack[-1] - right
+                elif op == BINARY_MUL:
+                    right = stack.pop()
+                    left = stack[-1]
+                    # "a" * n se comprueba antes de reservar el resultado
+                    if left.__class__ is str and isinstance(right, int):
+                        if len(left) * right > max_string:
+                            raise self.value_too_large(left)
+                    elif right.__class__ is str and isinstance(left, int):
+                        if len(right) * left > max_string:
+                            raise self.value_too_large(right)
+                    value = left * right
+                    if value.__class__ is int and not int_floor < value < int_limit:
+                        raise self.value_too_large(value)
+                    stack[-1] = value
+                elif op == BINARY_DIV:
+                    right = stack.pop()
+                    stack[-1] = stack[-1] / right
+                elif op == COMPARE_LT:
+                    right = stack.pop()
+                    stack[-1] = stack[-1] < right
+                elif op == COMPARE_GT:
+                    right = stack.pop()
+                    stack[-1] = stack[-1] > right
+                elif op == COMPARE_EQ:
+                    right = stack.pop()
+                    stack[-1] = stack[-1] == right
+                elif op == COMPARE_NEQ:
+                    right = stack.pop()
+                    stack[-1] = stack[-1] != right
+                elif op == COMPARE_GTE:
+                    right = stack.pop()
+                    stack[-1] = stack[-1] >= right
+                elif op == COMPARE_LTE:
+                    right = stack.pop()
+                    stack[-1] = stack[-1] <= right
+                elif op == POP_JUMP_IF_FALSE:
+                    if not stack.pop():
+                        pc = arg
+                elif op == JUMP:
+                    pc = arg
+                elif op == FOR_ITER:
+                    value = next(stack[-1], UNBOUND)
+                    if value is UNBOUND:
+                        stack.pop()
+                        pc = arg
+                    else:
+                        stack.append(value)
+                elif op == GET_RANGE_ITER:
+                    step = stack.pop()
+                    stop = stack.pop()
+                    stack[-1] = iter(range(stack[-1], stop, step))
+                elif op == LOAD_FREE:
+                    depth, slot, name = code_obj.freevars[arg]
+                    value = closure[depth - 1][slot]
+                    if value is UNBOUND:
+                        raise NameError(
+                            f"free variable '{name}' referenced before assignment in enclosing scope"
+                        )
+                    stack.append(value)
+                elif op == CALL:
+                    if arg:
+                        args = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        args = []
+                    func = stack.pop()
+                    if not isinstance(func, Function):
+                        raise TypeError(f"'{type(func).__name__}' object is not callable")
+                    callee = func.code
+                    if arg != callee.argcount:
+                        raise TypeError(
+                            f"{callee.name}() takes {callee.argcount} positional arguments but {arg} were given"
+                        )
+                    if len(frames) >= self.max_depth:
+                        raise RecursionError("maximum recursion depth exceeded")
+                    frames.append((code_obj, pc, local_vars, closure, stack))
+                    code_obj = callee
+                    code = callee.code
+                    consts = callee.consts
+                    names = callee.names
+                    local_vars = args + [UNBOUND] * (len(callee.varnames) - arg)
+                    closure = func.closure
+                    stack = []
+                    pc = 0
+                elif op == RETURN_VALUE:
+                    value = stack.pop()
+                    if not frames:
+                        return output
+                    code_obj, pc, local_vars, closure, stack = frames.pop()
+                    code = code_obj.code
+                    consts = code_obj.consts
+                    names = code_obj.names
+                    stack.append(value)
+                elif op == PRINT:
+                    line = str(stack.pop())
+                    output_room -= len(line)
+                    if output_room < 0:
+                        raise BudgetExceeded(f"Program output exceeds {self.max_output_size} characters")
+                    output.append(line)
+                elif op == POP_TOP:
+                    stack.pop()
+                elif op == MAKE_FUNCTION:
+                    # Las funciones anidadas capturan los slots de la función actual
+                    if code_obj is module:
+                        stack[-1] = Function(stack[-1], ())
+                    else:
+                        stack[-1] = Function(stack[-1], (local_vars,) + closure)
+                else:
+                    raise RuntimeError(f"Unknown opcode {op}")
+        finally:
+            self.steps = max_steps - max(budget, 0)
+            self.output_size += initial_room - max(output_room, 0)
+
+
+def run_program(ast_root, max_steps=1_000_000, max_depth=200):
+    """
+    Función de conveniencia: compila el AST y lo ejecuta en una VM nueva.
+    Devuelve la lista de líneas impresas.
+    """
+    vm = VM(max_steps=max_steps, max_depth=max_depth)
+    return vm.run(compile_program(ast_root))